@@ -44,12 +44,24 @@ def browser() -> Generator[requests.Session, None, None]:
     finally:
         s.close()
 
-def polite_pause(seconds: float = 1.0) -> None:
-    """Small, configurable delay between requests."""
-    time.sleep(seconds)
+# Monotonic timestamp of the last response that actually came back from DCAD.
+_last_fetch_ts = 0.0
+
+def polite_pause(min_gap_s: float = 1.0) -> None:
+    """Keep at least ``min_gap_s`` between real fetches.
+
+    Only the remainder of the gap since the last round-trip is slept, so time
+    already spent parsing or writing to the database counts toward it and
+    iterations that never reached the network do not wait at all.
+    """
+    remaining = min_gap_s - (time.monotonic() - _last_fetch_ts)
+    if remaining > 0:
+        time.sleep(remaining)
 
 def _get(session: requests.Session, url: str, timeout: float = 30.0) -> str:
+    global _last_fetch_ts
     resp = session.get(url, timeout=timeout)
+    _last_fetch_ts = time.monotonic()
     resp.raise_for_status()
     return resp.text
 
@@ -1076,14 +1076,20 @@ def parse_detail_html(
     exemption_details_html: str | None = None,
     exemption_details_history_html: str | None = None,
     html: str | None = None,
+    soup: BeautifulSoup | None = None,
     **_unused: Any,
 ) -> Dict[str, Any]:
-    if account_html is None and html is not None:
-        account_html = html
-    if not account_html:
-        raise ValueError("parse_detail_html: account_html (or html) is required")
-
-    soup = BeautifulSoup(account_html, "html.parser")
+    """Parse the account detail page.
+
+    Callers that already hold a parsed tree of the page can pass it as
+    ``soup`` to avoid parsing the HTML a second time.
+    """
+    if soup is None:
+        if account_html is None and html is not None:
+            account_html = html
+        if not account_html:
+            raise ValueError("parse_detail_html: account_html (or html) is required")
+        soup = BeautifulSoup(account_html, "html.parser")
 
     property_location = parse_property_location(soup)
     owner = parse_owner(soup)
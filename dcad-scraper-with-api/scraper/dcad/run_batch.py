@@ -3,9 +3,8 @@ from __future__ import annotations
 import os
 import sys
 import csv
-import time
 import logging
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 try:
     from dotenv import load_dotenv
@@ -13,7 +12,9 @@ try:
 except Exception:
     pass
 
-from .run_once import run_for_account
+from .fetch import polite_pause
+from .run_once import scrape_account
+from .upsert import upsert_parsed, upsert_parsed_many
 try:
     # When running as a package (python -m dcad.run_batch), import top-level utils
     from utils import normalize_account_id  # type: ignore
@@ -47,6 +48,27 @@ def _read_accounts_from_csv(path: str) -> List[str]:
     return out
 
 
+def _flush(pending: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], async_commit: bool = False) -> None:
+    """Write buffered accounts to the normalized tables in one transaction.
+
+    If the grouped write fails, every account is retried on its own so one bad
+    payload only loses its own rows.
+    """
+    if not pending:
+        return
+    try:
+        upsert_parsed_many(pending, async_commit=async_commit)
+        log.info("Upserted %d accounts", len(pending))
+    except Exception as e:
+        log.warning("Grouped upsert of %d accounts failed, retrying one by one: %s", len(pending), e)
+        for acc, detail, history in pending:
+            try:
+                upsert_parsed(acc, detail, history)
+            except Exception as e2:
+                log.error("Upsert failed for account_id=%s: %s", acc, e2, exc_info=True)
+    pending.clear()
+
+
 def main() -> None:
     logging.basicConfig(
         level=os.environ.get("LOG_LEVEL", "INFO"),
@@ -68,14 +90,21 @@ def main() -> None:
         sys.exit(2)
 
     delay = float(os.environ.get("BATCH_DELAY_SEC", "1.5"))
+    upsert_size = max(1, int(os.environ.get("BATCH_UPSERT_SIZE", "500")))
+    async_commit = os.environ.get("BATCH_ASYNC_COMMIT", "").strip().lower() in {"1", "true", "yes", "on"}
+    pending: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
     log.info("Starting batch for %d accounts", len(accounts))
     for i, acc in enumerate(accounts, 1):
         try:
             log.info("[%d/%d] Running account_id=%s", i, len(accounts), acc)
-            run_for_account(acc)
+            _, detail, history = scrape_account(acc)
+            pending.append((acc, detail, history))
         except Exception as e:
             log.error("Account %s failed: %s", acc, e, exc_info=True)
-        time.sleep(delay)
+        if len(pending) >= upsert_size:
+            _flush(pending, async_commit)
+        polite_pause(delay)
+    _flush(pending, async_commit)
     log.info("Batch complete")
 
 
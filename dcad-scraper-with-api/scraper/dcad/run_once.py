@@ -4,12 +4,17 @@
 #   python -m dcad.run_once_envfix 26272500060150000
 
 import os
+import re
 import sys
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict
+from itertools import takewhile
+from typing import Any, Dict, List, Tuple
+
+import orjson
+from bs4 import BeautifulSoup
 
 # Load environment from a local .env (DATABASE_URL, PGSSL, etc.)
 try:
@@ -22,7 +27,7 @@ from sqlalchemy import text
 
 # ---- DCAD project bits ----
 # Synchronous browser + fetchers
-from dcad.fetch import browser, get_detail_html, get_history_html, polite_pause
+from dcad.fetch import browser, get_detail_html, get_history_html
 from dcad.data_quality import CompletenessAssessment, require_complete_detail
 # Parsers for "Main Improvement" (primary) and "Additional Improvements" (secondary/history)
 from dcad.parse_detail import parse_detail_html
@@ -36,9 +41,29 @@ _SCHEMA = os.getenv("DB_SCHEMA") or os.getenv("DCAD_SCHEMA") or os.getenv("PGSCH
 def _tbl(name: str) -> str:
     return f"{_SCHEMA}.{name}" if _SCHEMA else name
 
+_RAW_TABLE = _tbl("dcad_json_raw")
+_INSERT_RAW_SQL = text(
+    f"""
+    INSERT INTO {_RAW_TABLE} (account_id, tax_year, source_url, raw)
+    VALUES (:account_id, :tax_year, :source_url, CAST(:raw AS JSONB))
+    ON CONFLICT (account_id, tax_year) DO UPDATE
+    SET source_url = EXCLUDED.source_url,
+        raw        = EXCLUDED.raw,
+        fetched_at = now()
+    """
+)
+
 
 log = logging.getLogger("dcad.run_once_envfix")
 
+# Owner-block lines that are labels/metadata rather than mailing address parts
+_NEG = re.compile(
+    r"multi-owner|owner name|ownership %|application received|hs application|ownership|owner\(",
+    re.I,
+)
+_WS = re.compile(r"\s+")
+_YEAR_KEYS = ("tax_year", "year", "assessment_year")
+
 
 def _json_default(o: Any) -> Any:
     """JSON serializer default that safely handles Decimal (convert to float)."""
@@ -47,31 +72,30 @@ def _json_default(o: Any) -> Any:
     raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
 
 
+def _snapshot_tax_year(detail: Dict[str, Any]) -> int:
+    """Choose a tax_year to label the snapshot. Prefer parsed value; else current year."""
+    year = next(
+        (int(v) for k in _YEAR_KEYS if (v := detail.get(k)) and str(v).isdigit()),
+        None,
+    )
+    # Resolved lazily: the continuous worker outlives a calendar year.
+    return year if year is not None else datetime.now().year
+
+
 def _save_raw_json(account_id: str, tax_year: int, source_url: str, raw_obj: Dict[str, Any]) -> None:
     """Persist a raw snapshot of what we scraped into dcad_json_raw."""
     db_url = os.environ.get("DATABASE_URL")
     if not db_url:
         raise RuntimeError("DATABASE_URL is not set")
 
-    payload = json.dumps(raw_obj, default=_json_default)
+    payload = orjson.dumps(raw_obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
 
     # Reuse the process-wide SQLAlchemy engine. Creating a new engine for every
     # account eventually exhausts database connections in a long-running worker.
     engine = get_engine()
 
-    sql = text(
-        f"""
-        INSERT INTO {_tbl('dcad_json_raw')} (account_id, tax_year, source_url, raw)
-        VALUES (:account_id, :tax_year, :source_url, CAST(:raw AS JSONB))
-        ON CONFLICT (account_id, tax_year) DO UPDATE
-        SET source_url = EXCLUDED.source_url,
-            raw        = EXCLUDED.raw,
-            fetched_at = now()
-        """
-    )
-
     with engine.begin() as conn:
-        conn.execute(sql, {
+        conn.execute(_INSERT_RAW_SQL, {
             "account_id": account_id,
             "tax_year": tax_year,
             "source_url": source_url,
@@ -79,91 +103,86 @@ def _save_raw_json(account_id: str, tax_year: int, source_url: str, raw_obj: Dic
         })
 
 
-def run_for_account(account_id: str) -> CompletenessAssessment:
-    """Scrape one account and upsert into Postgres."""
+def _looks_addr(s: str) -> bool:
+    if _NEG.search(s or ""):
+        return False
+    if re.search(r"\b(tx|texas|[A-Z]{2})\b", s, flags=re.I):
+        return True
+    if re.search(r"\b\d{5}(?:-\d{4})?\b", s):
+        return True
+    if re.search(r"^\s*\d+\s+", s):
+        return True
+    if re.search(r"\b(apt|unit|#|ct|ln|rd|dr|st|ave|blvd|hwy|pkwy|cir|trl|way|lane|drive|court|road)\b", s, flags=re.I):
+        return True
+    if "," in s:
+        return True
+    return False
+
+
+def _not_section_header(node: Any) -> bool:
+    return not (getattr(node, "name", None) == "span" and "DtlSectionHdr" in (node.get("class") or []))
+
+
+def _owner_block_lines(soup: BeautifulSoup) -> List[str]:
+    sp = soup.find(id="lblOwner")
+    if sp is None:
+        return []
+    # Whitespace-normalized text of every sibling up to the next section
+    # header; strings and elements both expose get_text, so no per-node type
+    # dispatch is needed.
+    texts = (
+        _WS.sub(" ", sib.get_text(" ")).strip()
+        for sib in takewhile(_not_section_header, sp.next_siblings)
+    )
+    return [t for t in texts if t]
+
+
+def _fallback_mailing_address(soup: BeautifulSoup, detail: Dict[str, Any]) -> None:
+    """Ensure mailing_address is present in parsed detail by using a DOM fallback on the Owner block."""
+    owner = detail.setdefault("owner", {}) if isinstance(detail, dict) else None
+    if not isinstance(owner, dict) or owner.get("mailing_address"):
+        return
+    try:
+        norm = _owner_block_lines(soup)
+    except Exception:
+        log.debug("Owner block fallback failed to read the detail page", exc_info=True)
+        return
+    if not norm:
+        return
+    # derive rest by skipping possible co-owner line (non-addressy short line)
+    rest = norm[1:]
+    if len(norm) > 1 and not _looks_addr(norm[1]) and len(norm[1]) <= 40:
+        rest = norm[2:]
+    addr_lines = [ln for ln in rest if _looks_addr(ln)]
+    if addr_lines:
+        owner["mailing_address"] = ", ".join(ln.strip(" ,") for ln in addr_lines if ln.strip(" ,"))
+
+
+def scrape_account(account_id: str) -> Tuple[CompletenessAssessment, Dict[str, Any], Dict[str, Any]]:
+    """Fetch, parse and snapshot one account without writing the normalized tables."""
     source_url = f"https://www.dallascad.org/AcctDetailRes.aspx?ID={account_id}"
 
-    # Fetch and validate the detail page before spending another request on
-    # history. A transient DCAD blank page now becomes a retry instead of a
-    # false success and an N/A snapshot.
-    with browser() as page:
+    # History is fetched on its own session while the detail page is pulled,
+    # parsed and validated, so the two round-trips overlap. A transient DCAD
+    # blank page still becomes a retry instead of a false success and an N/A
+    # snapshot; the history response is simply discarded in that case.
+    with browser() as page, browser() as history_page, ThreadPoolExecutor(max_workers=1) as pool:
+        history_future = pool.submit(get_history_html, history_page, account_id)
         detail_html = get_detail_html(page, account_id)
-        detail = parse_detail_html(detail_html) if detail_html else {}
+        # Parsed once; the mailing-address fallback reuses the same tree.
+        detail_soup = BeautifulSoup(detail_html, "html.parser") if detail_html else None
+        detail = parse_detail_html(soup=detail_soup) if detail_soup is not None else {}
         assessment = require_complete_detail(account_id, detail, detail_html)
-        polite_pause()
-        history_html = get_history_html(page, account_id)
+        history_html = history_future.result()
 
-    # Ensure mailing_address is present in parsed detail by using a DOM fallback on the Owner block
-    try:
-        if detail_html:
-            owner = detail.get("owner") if isinstance(detail, dict) else None
-            maddr = (owner or {}).get("mailing_address") if isinstance(owner, dict) else None
-            if not maddr:
-                from bs4 import BeautifulSoup  # type: ignore
-                import re as _re
-                soup = BeautifulSoup(detail_html, "lxml")
-                sp = soup.find(id="lblOwner")
-                if sp is not None:
-                    lines = []
-                    for sib in sp.next_siblings:
-                        # stop at next section header
-                        if getattr(sib, "name", None) == "span" and "DtlSectionHdr" in (sib.get("class") or []):
-                            break
-                        if isinstance(sib, str):
-                            t = sib.strip()
-                            if t:
-                                lines.append(t)
-                        else:
-                            t = (sib.get_text(" ") or "").strip()
-                            if t:
-                                lines.append(t)
-                    # normalize
-                    norm = [_re.sub(r"\s+", " ", s).strip() for s in lines if s and s.strip()]
-                    if norm:
-                        # derive rest by skipping possible co-owner line (non-addressy short line)
-                        def looks_addr(s: str) -> bool:
-                            s_low = (s or "").lower()
-                            if any(k in s_low for k in [
-                                "multi-owner", "owner name", "ownership %", "application received",
-                                "hs application", "ownership", "owner("
-                            ]):
-                                return False
-                            if _re.search(r"\b(tx|texas|[A-Z]{2})\b", s, flags=_re.I):
-                                return True
-                            if _re.search(r"\b\d{5}(?:-\d{4})?\b", s):
-                                return True
-                            if _re.search(r"^\s*\d+\s+", s):
-                                return True
-                            if _re.search(r"\b(apt|unit|#|ct|ln|rd|dr|st|ave|blvd|hwy|pkwy|cir|trl|way|lane|drive|court|road)\b", s_low):
-                                return True
-                            if "," in s:
-                                return True
-                            return False
-                        rest = norm[1:]
-                        if len(norm) > 1 and not looks_addr(norm[1]) and len(norm[1]) <= 40:
-                            rest = norm[2:]
-                        addr_lines = [ln for ln in rest if looks_addr(ln)]
-                        if addr_lines:
-                            mailing = ", ".join(addr_lines).replace(" ,", ",").strip(", ")
-                            if isinstance(detail.get("owner"), dict):
-                                detail["owner"]["mailing_address"] = mailing
-                            else:
-                                detail["owner"] = {"owner_name": (owner or {}).get("owner_name"), "mailing_address": mailing}
-    except Exception:
-        pass
+    if detail_soup is not None:
+        _fallback_mailing_address(detail_soup, detail)
     history = parse_history_html(history_html) if history_html else {}
+    # Only the parsed dicts are snapshotted; release the page text and tree so
+    # they are not held alongside the serialized snapshot.
+    detail_html = history_html = detail_soup = None
 
-    # Choose a tax_year to label the snapshot. Prefer parsed value; else current year.
-    tax_year = None
-    for key in ("tax_year", "year", "assessment_year"):
-        if key in detail and detail[key]:
-            try:
-                tax_year = int(detail[key])
-                break
-            except Exception:
-                pass
-    if tax_year is None:
-        tax_year = datetime.now().year
+    tax_year = _snapshot_tax_year(detail)
 
     # 3) Save the raw snapshot. A failure must propagate so the continuous
     # worker records a retry instead of treating an incomplete write as success.
@@ -175,6 +194,12 @@ def run_for_account(account_id: str) -> CompletenessAssessment:
         "history": history,
     }
     _save_raw_json(account_id, tax_year, source_url, snapshot)
+    return assessment, detail, history
+
+
+def run_for_account(account_id: str) -> CompletenessAssessment:
+    """Scrape one account and upsert into Postgres."""
+    assessment, detail, history = scrape_account(account_id)
 
     # 4) Upsert the parsed structures into your normalized tables
     upsert_parsed(account_id, detail, history)
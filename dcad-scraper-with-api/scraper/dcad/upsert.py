@@ -1,22 +1,33 @@
 from __future__ import annotations
 
+import io
 import os
-import json
+import re
 import logging
+from collections import defaultdict
+from contextlib import contextmanager
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+import orjson
+from sqlalchemy import column, create_engine, func, insert, table, text
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.orm import sessionmaker
 
 log = logging.getLogger("dcad.upsert")
 
-_SCHEMA = os.getenv("DB_SCHEMA") or os.getenv("DCAD_SCHEMA") or os.getenv("PGSCHEMA")
+# Folded to lower case the way Postgres folds the unquoted name in _tbl()'s raw
+# SQL, so Core table(schema=...) statements, which quote mixed case, hit the
+# same schema.
+_SCHEMA = (os.getenv("DB_SCHEMA") or os.getenv("DCAD_SCHEMA") or os.getenv("PGSCHEMA") or "").lower() or None
 
 def _tbl(name: str) -> str:
     return f"{_SCHEMA}.{name}" if _SCHEMA else name
 
+# The normalized tables only exist in the core schema; fixed for the process.
+_IS_CORE = _SCHEMA == "core"
+
 _ENGINE: Optional[Engine] = None
 _Session = None
 
@@ -26,7 +37,32 @@ def get_engine() -> Engine:
         db_url = os.getenv("DATABASE_URL")
         if not db_url:
             raise RuntimeError("DATABASE_URL is not set")
-        _ENGINE = create_engine(db_url, pool_pre_ping=True, future=True)
+        options: Dict[str, Any] = {
+            "pool_pre_ping": True,
+            "future": True,
+            # JSONB binds (legal_lines) serialize through orjson
+            "json_serializer": lambda o: orjson.dumps(o).decode(),
+        }
+        driver = make_url(db_url).get_driver_name()
+        if driver == "psycopg2":
+            # Route list-of-params executes through psycopg2's execute_values /
+            # execute_batch helpers instead of one round-trip per row.
+            options.update(
+                executemany_mode="values_plus_batch",
+                insertmanyvalues_page_size=1000,
+                executemany_batch_page_size=500,
+            )
+        elif driver == "psycopg":
+            # SQLAlchemy's psycopg 3 dialect never rewrites an executemany into
+            # multi-row VALUES (insertmanyvalues is psycopg2-only here); the
+            # batches go to psycopg's executemany inside _pipelined instead.
+            # psycopg 3 switches a query to a server-side prepared statement after
+            # prepare_threshold runs on a connection. Every upsert statement repeats
+            # per account, so prepare on first use. DB_PREPARE_THRESHOLD=none turns
+            # it off (e.g. behind a transaction-pooling pgbouncer).
+            raw = (os.getenv("DB_PREPARE_THRESHOLD") or "1").strip().lower()
+            options["connect_args"] = {"prepare_threshold": None if raw == "none" else int(raw)}
+        _ENGINE = create_engine(db_url, **options)
         _Session = sessionmaker(bind=_ENGINE, autoflush=False, autocommit=False, future=True)
     return _ENGINE
 
@@ -35,13 +71,20 @@ def get_session():
         get_engine()
     return _Session()
 
-_NULLISH = {None, "", "N/A", "NA", "NONE", "UNASSIGNED", "NULL", "N\\A"}
+_NULLISH = frozenset({None, "", "N/A", "NA", "NONE", "UNASSIGNED", "NULL", "N\\A"})
+# Longest entry in _NULLISH; anything longer can skip the upper() copy.
+_NULLISH_MAXLEN = max(len(t) for t in _NULLISH if t)
 
 def _is_nullish(v: Any) -> bool:
     if v is None:
         return True
     if isinstance(v, str):
-        return v.strip().upper() in _NULLISH
+        t = v.strip()
+        if not t:
+            return True
+        if len(t) > _NULLISH_MAXLEN:
+            return False
+        return t.upper() in _NULLISH
     return False
 
 def to_text_or_none(v: Any) -> Optional[str]:
@@ -49,17 +92,23 @@ def to_text_or_none(v: Any) -> Optional[str]:
         return None
     return str(v).strip()
 
+# Formatting noise stripped before numeric parsing: one regex pass instead of a
+# chain of str.replace copies. Ints keep rejecting "%" as they always have.
+_INT_JUNK = re.compile(r"[$,]")
+_DEC_JUNK = re.compile(r"[$,%]")
+
 def to_int_or_none(v: Any) -> Optional[int]:
     if _is_nullish(v):
         return None
     try:
-        s = str(v)
         # normalize common formats like "$1,234" or "(1,234)"
-        s = s.replace("$", "").replace(",", "").strip()
+        s = _INT_JUNK.sub("", str(v)).strip()
         if s.startswith("(") and s.endswith(")"):
             s = "-" + s[1:-1]
         if s == "":
             return None
+        if s.lstrip("-").isdigit():
+            return int(s)
         return int(float(s))
     except (ValueError, TypeError):
         return None
@@ -68,9 +117,8 @@ def to_decimal_or_none(v: Any) -> Optional[Decimal]:
     if _is_nullish(v):
         return None
     try:
-        s = str(v)
         # strip currency/percent and commas; support parentheses for negatives
-        s = s.replace("$", "").replace("%", "").replace(",", "").strip()
+        s = _DEC_JUNK.sub("", str(v)).strip()
         if s.startswith("(") and s.endswith(")"):
             s = "-" + s[1:-1]
         if s == "":
@@ -79,697 +127,832 @@ def to_decimal_or_none(v: Any) -> Optional[Decimal]:
     except (InvalidOperation, ValueError, TypeError):
         return None
 
-def upsert_parsed(account_id: str, detail: Dict[str, Any], history: Dict[str, Any]) -> None:
-    engine = get_engine()
-    with get_session() as s:
-        # Keep FK safety for core schema
-        if (_SCHEMA or "").lower() == "core":
-            s.execute(
-                text(f"INSERT INTO {_tbl('accounts')} (account_id) VALUES (:account_id) ON CONFLICT (account_id) DO NOTHING"),
-                {"account_id": account_id},
-            )
-            # Update basic situs/location metadata on accounts when available
-            try:
-                prop_loc = (detail or {}).get("property_location") or {}
-                address = to_text_or_none(prop_loc.get("address") or prop_loc.get("subject_address"))
-                neighborhood = to_text_or_none(prop_loc.get("neighborhood"))
-                mapsco = to_text_or_none(prop_loc.get("mapsco"))
-                legal = (detail or {}).get("legal_description") or {}
-                lines = legal.get("lines") if isinstance(legal, dict) else None
-                subdivision = None
-                if isinstance(lines, list) and lines:
-                    subdivision = to_text_or_none(lines[0])
-                if address or neighborhood or mapsco or subdivision:
-                    s.execute(
-                        text(
-                            f"""
-                            UPDATE {_tbl('accounts')}
-                            SET
-                              address = COALESCE(:address, address),
-                              neighborhood_code = COALESCE(:neighborhood, neighborhood_code),
-                              mapsco = COALESCE(:mapsco, mapsco),
-                              subdivision = COALESCE(:subdivision, subdivision)
-                            WHERE account_id = :account_id
-                            """
-                        ),
-                        {
-                            "account_id": account_id,
-                            "address": address,
-                            "neighborhood": neighborhood,
-                            "mapsco": mapsco,
-                            "subdivision": subdivision,
-                        },
-                    )
-            except Exception:
-                pass
-        # -------- primary_improvements (core mapping) --------
-        primary: Dict[str, Any] = (
-            (detail or {}).get("primary_improvements")
-            or (detail or {}).get("main_improvement")
-            or (detail or {}).get("primary")
-            or {}
+# Plain numeric literal as both Decimal() and Postgres numeric input accept it.
+# ASCII digits only: Decimal() takes other Unicode digits, Postgres does not.
+_NUMERIC_LITERAL = re.compile(r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+
+def to_numeric_str_or_none(v: Any) -> Optional[str]:
+    """Like to_decimal_or_none, but return the cleaned literal instead of a Decimal.
+
+    Values bound for numeric columns are sent as text and parsed by Postgres,
+    which skips building a Decimal only for the driver to serialize it again.
+    """
+    if _is_nullish(v):
+        return None
+    s = _DEC_JUNK.sub("", str(v)).strip()
+    if s.startswith("(") and s.endswith(")"):
+        s = "-" + s[1:-1]
+    return s if _NUMERIC_LITERAL.fullmatch(s) else None
+
+# ARB hearing info: a MM/DD/YYYY date or the "Hearing Info: X" type letter
+_ARB_INFO = re.compile(r"(?P<mo>\d{1,2})/(?P<d>\d{1,2})/(?P<y>\d{4})|Hearing Info:\s*(?P<t>[A-Z])\b")
+
+# Row count above which a batch switches to COPY; below it the COPY setup
+# costs more than the batched INSERT it replaces.
+_COPY_MIN_ROWS = 64
+
+def _copy_field(v: Any) -> str:
+    if v is None:
+        return "\\N"
+    return (
+        str(v)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+def _copy_cursor(conn: Connection):
+    """Raw cursor for COPY on the connection, or None without a COPY hook.
+
+    Only psycopg2's copy_expert is used; psycopg 3 runs upserts in pipeline
+    mode, where COPY is not available, so callers fall back to INSERT.
+    """
+    cur = conn.connection.driver_connection.cursor()
+    if hasattr(cur, "copy_expert"):
+        return cur
+    cur.close()
+    return None
+
+def _copy_rows(cur, table: str, columns: Tuple[str, ...], rows: Iterable[Dict[str, Any]]) -> None:
+    """Stream rows into table with COPY FROM STDIN in the cursor's transaction."""
+    buf = io.StringIO()
+    for r in rows:
+        buf.write("\t".join(_copy_field(r[c]) for c in columns))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+_SEC_IMP_COLUMNS = (
+    "account_id", "tax_obj_id", "sec_imp_number", "sec_imp_type", "sec_imp_desc",
+    "sec_imp_year_built", "sec_imp_cons_type", "sec_imp_floor", "sec_imp_ext_wall",
+    "sec_imp_stories", "sec_imp_sqft", "sec_imp_value", "sec_imp_depreciation",
+)
+
+_LAND_COLUMNS = (
+    "account_id", "tax_year", "line_number", "state_code", "zoning", "frontage_ft", "depth_ft",
+    "area_sqft", "pricing_method", "unit_price", "market_adjustment_pct", "adjusted_price", "ag_land",
+)
+
+def _as_dict(v: Any) -> Dict[str, Any]:
+    """v if it is a dict, else an empty one (for sections a parse may leave malformed)."""
+    return v if isinstance(v, dict) else {}
+
+def _year_or_none(v: Any) -> Optional[int]:
+    """int(v) for a truthy v that parses, else None."""
+    if not v:
+        return None
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+_TRUE_SET = frozenset({"Y", "YES", "TRUE", "1"})
+
+def _bool(v):
+    t = to_text_or_none(v)  # already stripped
+    return None if t is None else t.upper() in _TRUE_SET
+
+# primary_improvements column -> converter for the same-named parsed field, in
+# column order. "stories" is special-cased in _upsert_account.
+_PRIMARY_CONV = {
+    "construction_type": to_text_or_none,
+    "percent_complete": to_numeric_str_or_none,
+    "year_built": to_int_or_none,
+    "effective_year_built": to_int_or_none,
+    "actual_age": to_int_or_none,
+    "depreciation": to_numeric_str_or_none,
+    "desirability": to_text_or_none,
+    "stories": to_text_or_none,
+    "living_area_sqft": to_int_or_none,
+    "total_living_area": to_int_or_none,
+    "bedroom_count": to_int_or_none,
+    "bath_count": to_numeric_str_or_none,
+    "basement": _bool,
+    "kitchens": to_int_or_none,
+    "wetbars": to_int_or_none,
+    "fireplaces": to_int_or_none,
+    "sprinkler": _bool,
+    "spa": _bool,
+    "pool": _bool,
+    "sauna": _bool,
+    "air_conditioning": to_text_or_none,
+    "heating": to_text_or_none,
+    "foundation": to_text_or_none,
+    "roof_material": to_text_or_none,
+    "roof_type": to_text_or_none,
+    "exterior_material": to_text_or_none,
+    "fence_type": to_text_or_none,
+    "number_units": to_int_or_none,
+    "building_class": to_text_or_none,
+    "desirability_raw": to_text_or_none,
+    "desirability_id": to_int_or_none,
+    "total_area_sqft": to_int_or_none,
+    "stories_raw": to_text_or_none,
+    "baths_full": to_int_or_none,
+    "baths_half": to_int_or_none,
+    "deck": to_text_or_none,
+    "basement_raw": to_text_or_none,
+}
+_PRIMARY_COLS = tuple(_PRIMARY_CONV)
+_PRIMARY_SET = ",\n          ".join(f"{c} = EXCLUDED.{c}" for c in _PRIMARY_COLS)
+_PRIMARY_COALESCE_SET = ",\n          ".join(
+    f"{c} = COALESCE(EXCLUDED.{c}, {_tbl('primary_improvements')}.{c})" for c in _PRIMARY_COLS
+)
+
+def _plain_insert(name: str, *columns: str):
+    """Core INSERT for an append-only table (no ON CONFLICT).
+
+    Unlike text(), a Core insert() lets SQLAlchemy's insertmanyvalues fold an
+    executemany into multi-row VALUES pages. That rewrite is psycopg2-only:
+    SQLAlchemy's psycopg 3 dialect leaves use_insertmanyvalues_wo_returning
+    off, so there the executemany goes to psycopg's own executemany, which
+    _pipelined sends without a round-trip per row. Parameter keys are the
+    column names.
+    """
+    return insert(table(name, *(column(c) for c in columns), schema=_SCHEMA))
+
+def _upsert(
+    name: str,
+    columns: Tuple[str, ...],
+    conflict: Tuple[str, ...],
+    *,
+    overwrite: Tuple[str, ...] = (),
+    coalesce: Tuple[str, ...] = (),
+    types: Optional[Dict[str, Any]] = None,
+):
+    """Core INSERT ... ON CONFLICT DO UPDATE.
+
+    ``overwrite`` columns take EXCLUDED.c; ``coalesce`` columns take
+    COALESCE(EXCLUDED.c, c) so NULLs keep the stored value. Like _plain_insert
+    this is eligible for insertmanyvalues on psycopg2, so only use it where a
+    batch can never repeat a conflict key: one multi-row VALUES cannot touch a
+    row twice.
+    """
+    types = types or {}
+    tbl = table(name, *(column(c, types.get(c)) for c in columns), schema=_SCHEMA)
+    stmt = pg_insert(tbl)
+    set_ = {c: stmt.excluded[c] for c in overwrite}
+    set_.update({c: func.coalesce(stmt.excluded[c], tbl.c[c]) for c in coalesce})
+    return stmt.on_conflict_do_update(index_elements=list(conflict), set_=set_)
+
+_EXEMPTION_COLUMNS = (
+    "account_id", "tax_year", "jurisdiction_key", "taxing_jurisdiction",
+    "homestead_exemption", "disabled_vet", "taxable_value",
+)
+_EXEMPTION_UPDATE = _EXEMPTION_COLUMNS[3:]
+
+# Statements are built once at import (after _SCHEMA resolves) rather than per
+# account, so the f-string formatting and statement construction happen a single time.
+_STMTS = {
+    "accounts_upsert": text(
+        f"""
+        INSERT INTO {_tbl('accounts')} (account_id, address, neighborhood_code, mapsco, subdivision)
+        VALUES (:account_id, :address, :neighborhood, :mapsco, :subdivision)
+        ON CONFLICT (account_id) DO UPDATE SET
+          address = COALESCE(EXCLUDED.address, {_tbl('accounts')}.address),
+          neighborhood_code = COALESCE(EXCLUDED.neighborhood_code, {_tbl('accounts')}.neighborhood_code),
+          mapsco = COALESCE(EXCLUDED.mapsco, {_tbl('accounts')}.mapsco),
+          subdivision = COALESCE(EXCLUDED.subdivision, {_tbl('accounts')}.subdivision)
+        WHERE EXCLUDED.address IS NOT NULL OR EXCLUDED.neighborhood_code IS NOT NULL
+          OR EXCLUDED.mapsco IS NOT NULL OR EXCLUDED.subdivision IS NOT NULL
+        """
+    ),
+    "primary_upsert": text(
+        f"""
+        INSERT INTO {_tbl('primary_improvements')} (account_id, {', '.join(_PRIMARY_COLS)})
+        VALUES (:account_id, {', '.join(f':{c}' for c in _PRIMARY_COLS)})
+        ON CONFLICT (account_id) DO UPDATE SET
+          {_PRIMARY_SET}
+        """
+    ),
+    # Accounts with no stored row when the batch read primary_improvements: a
+    # concurrent writer may insert one before us, so NULLs must not clobber it
+    "primary_insert": text(
+        f"""
+        INSERT INTO {_tbl('primary_improvements')} (account_id, {', '.join(_PRIMARY_COLS)})
+        VALUES (:account_id, {', '.join(f':{c}' for c in _PRIMARY_COLS)})
+        ON CONFLICT (account_id) DO UPDATE SET
+          {_PRIMARY_COALESCE_SET}
+        """
+    ),
+    "secondary_delete": text(f"DELETE FROM {_tbl('secondary_improvements')} WHERE account_id = :account_id"),
+    "secondary_insert": _plain_insert("secondary_improvements", *_SEC_IMP_COLUMNS),
+    "owner_summary_upsert": text(
+        f"""
+        INSERT INTO {_tbl('owner_summary')} (account_id, tax_year, owner_name, mailing_address)
+        VALUES (:account_id, :tax_year, :owner_name, :mailing_address)
+        ON CONFLICT (account_id, tax_year) DO UPDATE SET
+          owner_name = COALESCE(EXCLUDED.owner_name, {_tbl('owner_summary')}.owner_name),
+          mailing_address = COALESCE(EXCLUDED.mailing_address, {_tbl('owner_summary')}.mailing_address)
+        """
+    ),
+    "owner_parties_delete": text(f"DELETE FROM {_tbl('owner_parties')} WHERE account_id = :account_id AND tax_year = :tax_year"),
+    "owner_parties_insert": _plain_insert(
+        "owner_parties", "account_id", "tax_year", "owner_name", "ownership_pct"
+    ),
+    "arb_hearing_insert": text(
+        f"""
+        INSERT INTO {_tbl('arb_hearing')} (account_id, hearing_date, hearing_type, result)
+        VALUES (:account_id, :hearing_date, :hearing_type, :result)
+        ON CONFLICT DO NOTHING
+        """
+    ),
+    "value_summary_upsert": text(
+        f"""
+        WITH cur AS (
+          INSERT INTO {_tbl('value_summary_current')} (
+            account_id, certified_year, improvement_value, land_value, market_value, capped_value,
+            tax_agent, revaluation_year, previous_revaluation_year
+          ) VALUES (
+            :account_id, :certified_year, :improvement_value, :land_value, :market_value, :capped_value,
+            :tax_agent, :revaluation_year, :previous_revaluation_year
+          )
+          ON CONFLICT (account_id) DO UPDATE SET
+            certified_year = COALESCE(EXCLUDED.certified_year, {_tbl('value_summary_current')}.certified_year),
+            improvement_value = COALESCE(EXCLUDED.improvement_value, {_tbl('value_summary_current')}.improvement_value),
+            land_value = COALESCE(EXCLUDED.land_value, {_tbl('value_summary_current')}.land_value),
+            market_value = COALESCE(EXCLUDED.market_value, {_tbl('value_summary_current')}.market_value),
+            capped_value = COALESCE(EXCLUDED.capped_value, {_tbl('value_summary_current')}.capped_value),
+            tax_agent = COALESCE(EXCLUDED.tax_agent, {_tbl('value_summary_current')}.tax_agent),
+            revaluation_year = COALESCE(EXCLUDED.revaluation_year, {_tbl('value_summary_current')}.revaluation_year),
+            previous_revaluation_year = COALESCE(EXCLUDED.previous_revaluation_year, {_tbl('value_summary_current')}.previous_revaluation_year)
+        )
+        INSERT INTO {_tbl('value_summary_history')} (
+          account_id, certified_year, improvement_value, land_value, market_value, capped_value,
+          tax_agent, revaluation_year, previous_revaluation_year
+        ) VALUES (
+          :account_id, :certified_year, :improvement_value, :land_value, :market_value, :capped_value,
+          :tax_agent, :revaluation_year, :previous_revaluation_year
+        )
+        ON CONFLICT (account_id, certified_year) DO UPDATE SET
+          improvement_value = COALESCE(EXCLUDED.improvement_value, {_tbl('value_summary_history')}.improvement_value),
+          land_value = COALESCE(EXCLUDED.land_value, {_tbl('value_summary_history')}.land_value),
+          market_value = COALESCE(EXCLUDED.market_value, {_tbl('value_summary_history')}.market_value),
+          capped_value = COALESCE(EXCLUDED.capped_value, {_tbl('value_summary_history')}.capped_value),
+          tax_agent = COALESCE(EXCLUDED.tax_agent, {_tbl('value_summary_history')}.tax_agent),
+          revaluation_year = COALESCE(EXCLUDED.revaluation_year, {_tbl('value_summary_history')}.revaluation_year),
+          previous_revaluation_year = COALESCE(EXCLUDED.previous_revaluation_year, {_tbl('value_summary_history')}.previous_revaluation_year)
+        """
+    ),
+    "market_value_upsert": text(
+        f"""
+        INSERT INTO {_tbl('market_value_history')} (
+          account_id, tax_year, imp_value, land_value, total_market_value, homestead_capped
+        ) VALUES (
+          :account_id, :tax_year, :imp_value, :land_value, :total_market_value, :homestead_capped
+        )
+        ON CONFLICT (account_id, tax_year) DO UPDATE SET
+          imp_value = COALESCE(EXCLUDED.imp_value, {_tbl('market_value_history')}.imp_value),
+          land_value = COALESCE(EXCLUDED.land_value, {_tbl('market_value_history')}.land_value),
+          total_market_value = COALESCE(EXCLUDED.total_market_value, {_tbl('market_value_history')}.total_market_value),
+          homestead_capped = COALESCE(EXCLUDED.homestead_capped, {_tbl('market_value_history')}.homestead_capped)
+        """
+    ),
+    "taxable_value_upsert": text(
+        f"""
+        INSERT INTO {_tbl('taxable_value_history')} (account_id, tax_year, jurisdiction_key, taxable_value)
+        VALUES (:account_id, :tax_year, :jur, :taxable_value)
+        ON CONFLICT (account_id, tax_year, jurisdiction_key) DO UPDATE SET
+          taxable_value = EXCLUDED.taxable_value
+        """
+    ),
+    # Jurisdiction keys are unique per account and accounts are deduped per
+    # batch, so both exemption upserts can go out as multi-row VALUES on
+    # psycopg2 (a pipelined executemany on psycopg 3).
+    "exemptions_summary_upsert": _upsert(
+        "exemptions_summary", _EXEMPTION_COLUMNS, ("account_id", "jurisdiction_key"),
+        coalesce=_EXEMPTION_UPDATE,
+    ),
+    "exemptions_history_upsert": _upsert(
+        "exemptions_history", _EXEMPTION_COLUMNS, ("account_id", "tax_year", "jurisdiction_key"),
+        coalesce=_EXEMPTION_UPDATE,
+    ),
+    "land_delete": text(f"DELETE FROM {_tbl('land_detail')} WHERE account_id = :account_id AND tax_year = :tax_year"),
+    "land_insert": _plain_insert("land_detail", *_LAND_COLUMNS),
+    "legal_current_upsert": _upsert(
+        "legal_description_current",
+        ("account_id", "tax_year", "legal_lines", "legal_text", "deed_transfer_raw", "deed_transfer_date"),
+        ("account_id",),
+        overwrite=("tax_year", "legal_lines", "legal_text", "deed_transfer_raw"),
+        coalesce=("deed_transfer_date",),
+        types={"legal_lines": JSONB},
+    ),
+    # Both history tables take the same per-year rows. The whole batch is bound
+    # as column arrays (see _UNNEST_COLUMNS) and fanned out server-side, so one
+    # statement covers both tables. _collect_account folds owner_history to one
+    # row per year, since neither ON CONFLICT may touch a row twice.
+    "owner_history_upsert": text(
+        f"""
+        WITH r AS (
+          SELECT * FROM unnest(
+            CAST(:account_id AS text[]), CAST(:observed_year AS int[]), CAST(:deed_raw AS text[]),
+            CAST(:deed_date AS date[]), CAST(:legal_lines AS jsonb[]), CAST(:legal_text AS text[])
+          ) AS t(account_id, observed_year, deed_raw, deed_date, legal_lines, legal_text)
+        ), own AS (
+          INSERT INTO {_tbl('ownership_history')} (
+            account_id, observed_year, deed_transfer_date_raw, deed_transfer_date
+          )
+          SELECT account_id, observed_year, deed_raw, deed_date FROM r
+          ON CONFLICT (account_id, observed_year) DO UPDATE SET
+            deed_transfer_date_raw = EXCLUDED.deed_transfer_date_raw,
+            deed_transfer_date = COALESCE(EXCLUDED.deed_transfer_date, {_tbl('ownership_history')}.deed_transfer_date)
+        )
+        INSERT INTO {_tbl('legal_description_history')} (
+          account_id, tax_year, legal_lines, legal_text, deed_transfer_raw, deed_transfer_date
+        )
+        SELECT account_id, observed_year, legal_lines, legal_text, deed_raw, deed_date FROM r
+        ON CONFLICT (account_id, tax_year) DO UPDATE SET
+          legal_lines = EXCLUDED.legal_lines,
+          legal_text = EXCLUDED.legal_text,
+          deed_transfer_raw = EXCLUDED.deed_transfer_raw,
+          deed_transfer_date = COALESCE(EXCLUDED.deed_transfer_date, {_tbl('legal_description_history')}.deed_transfer_date)
+        """
+    ),
+    "estimated_taxes_delete": text(f"DELETE FROM {_tbl('estimated_taxes')} WHERE account_id = :account_id AND tax_year = :tax_year"),
+    # Six fixed jurisdictions per account: bound as column arrays and unnested,
+    # so the batch is one statement however many accounts it holds.
+    "estimated_taxes_insert": text(
+        f"""
+        INSERT INTO {_tbl('estimated_taxes')} (
+          account_id, tax_year, jurisdiction_key, taxing_unit, tax_rate_per_100,
+          taxable_value, estimated_taxes_amt, tax_ceiling
+        )
+        SELECT * FROM unnest(
+          CAST(:account_id AS text[]), CAST(:tax_year AS int[]), CAST(:jurisdiction_key AS text[]),
+          CAST(:taxing_unit AS text[]), CAST(:tax_rate_per_100 AS numeric[]),
+          CAST(:taxable_value AS numeric[]), CAST(:estimated_taxes_amt AS numeric[]),
+          CAST(:tax_ceiling AS numeric[])
+        )
+        """
+    ),
+    "estimated_taxes_total_upsert": text(
+        f"""
+        INSERT INTO {_tbl('estimated_taxes_total')} (account_id, tax_year, total_estimated)
+        VALUES (:account_id, :tax_year, :total)
+        ON CONFLICT (account_id) DO UPDATE SET
+          tax_year = COALESCE(EXCLUDED.tax_year, {_tbl('estimated_taxes_total')}.tax_year),
+          total_estimated = COALESCE(EXCLUDED.total_estimated, {_tbl('estimated_taxes_total')}.total_estimated)
+        """
+    ),
+}
+
+def _copy_secondary(cur, params: List[Dict[str, Any]]) -> None:
+    _copy_rows(cur, _tbl("secondary_improvements"), _SEC_IMP_COLUMNS, params)
+
+def _copy_land(cur, params: List[Dict[str, Any]]) -> None:
+    _copy_rows(cur, _tbl("land_detail"), _LAND_COLUMNS, params)
+
+# taxable_value_history is an upsert, so COPY lands in a temp staging table that
+# is merged in one INSERT ... SELECT. "ord" keeps input order: ON CONFLICT cannot
+# touch a row twice per statement, so DISTINCT ON keeps the last row per key,
+# which is what sequential upserts would have left behind.
+_TAXABLE_STAGE_COLUMNS = ("ord", "account_id", "tax_year", "jurisdiction_key", "taxable_value")
+_TAXABLE_STAGE_SQL = (
+    "CREATE TEMP TABLE _taxable_stage AS SELECT 0 AS ord, account_id, tax_year, jurisdiction_key, taxable_value "
+    f"FROM {_tbl('taxable_value_history')} WITH NO DATA"
+)
+_TAXABLE_MERGE_SQL = f"""
+    INSERT INTO {_tbl('taxable_value_history')} (account_id, tax_year, jurisdiction_key, taxable_value)
+    SELECT DISTINCT ON (account_id, tax_year, jurisdiction_key) account_id, tax_year, jurisdiction_key, taxable_value
+    FROM _taxable_stage
+    ORDER BY account_id, tax_year, jurisdiction_key, ord DESC
+    ON CONFLICT (account_id, tax_year, jurisdiction_key) DO UPDATE SET
+      taxable_value = EXCLUDED.taxable_value
+"""
+
+def _copy_taxable_values(cur, params: List[Dict[str, Any]]) -> None:
+    cur.execute(_TAXABLE_STAGE_SQL)
+    _copy_rows(
+        cur,
+        "_taxable_stage",
+        _TAXABLE_STAGE_COLUMNS,
+        (
+            {
+                "ord": i,
+                "account_id": p["account_id"],
+                "tax_year": p["tax_year"],
+                "jurisdiction_key": p["jur"],
+                "taxable_value": p["taxable_value"],
+            }
+            for i, p in enumerate(params)
+        ),
+    )
+    cur.execute(_TAXABLE_MERGE_SQL)
+    cur.execute("DROP TABLE _taxable_stage")
+
+# Stored primary_improvements rows for a batch, locked until commit so the merge
+# below cannot race another writer on them. FOR UPDATE cannot lock rows that do
+# not exist yet, so accounts without one keep the COALESCE statement. Locks are
+# taken in account_id order so overlapping batches cannot deadlock each other.
+_PRIMARY_EXISTING_SQL = text(
+    f"SELECT account_id, {', '.join(_PRIMARY_COLS)} FROM {_tbl('primary_improvements')} "
+    "WHERE account_id = ANY(:ids) ORDER BY account_id FOR UPDATE"
+)
+
+def _merge_existing_primary(conn: Connection, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Fill NULL incoming primary fields from the locked stored rows.
+
+    Merged accounts stay on primary_upsert, which overwrites columns outright
+    instead of evaluating a COALESCE per column server-side. Accounts with no
+    stored row move to primary_insert, whose COALESCE still guards a row
+    inserted concurrently after the read.
+    """
+    params = batch.pop("primary_upsert", None)
+    if not params:
+        return
+    existing = {
+        row["account_id"]: row
+        for row in conn.execute(_PRIMARY_EXISTING_SQL, {"ids": [p["account_id"] for p in params]}).mappings()
+    }
+    for p in params:
+        old = existing.get(p["account_id"])
+        if old is None:
+            batch["primary_insert"].append(p)
+        else:
+            batch["primary_upsert"].append({c: old[c] if v is None else v for c, v in p.items()})
+
+# Statements bound once per batch with each key as a column array for unnest(),
+# instead of as an executemany of row dicts
+_UNNEST_COLUMNS = {
+    "owner_history_upsert": (
+        "account_id", "observed_year", "deed_raw", "deed_date", "legal_lines", "legal_text",
+    ),
+    "estimated_taxes_insert": (
+        "account_id", "tax_year", "jurisdiction_key", "taxing_unit", "tax_rate_per_100",
+        "taxable_value", "estimated_taxes_amt", "tax_ceiling",
+    ),
+}
+
+# Statements whose large batches are written over COPY instead of executemany
+_COPY_WRITERS = {
+    "secondary_insert": _copy_secondary,
+    "land_insert": _copy_land,
+    "taxable_value_upsert": _copy_taxable_values,
+}
+
+def _collect_account(
+    batch: Dict[str, List[Dict[str, Any]]], account_id: str, detail: Dict[str, Any], history: Dict[str, Any]
+) -> bool:
+    """Append one account's parameter sets to ``batch``, keyed by _STMTS name.
+
+    Returns False when the payload has nothing to write.
+    """
+    detail = detail or {}
+    history = history or {}
+    if not account_id or not (detail or history):
+        # Partial scrape with nothing to write; skip rather than stub out rows.
+        log.debug("Nothing to upsert for account_id=%r", account_id)
+        return False
+    # tax_year from detail, shared by every current-year section below
+    tax_year = _year_or_none(detail.get("tax_year"))
+
+    # Keep FK safety for core schema, with basic situs/location metadata when available
+    prop_loc = _as_dict(detail.get("property_location"))
+    lines = _as_dict(detail.get("legal_description")).get("lines")
+    address = to_text_or_none(prop_loc.get("address") or prop_loc.get("subject_address"))
+    neighborhood = to_text_or_none(prop_loc.get("neighborhood"))
+    mapsco = to_text_or_none(prop_loc.get("mapsco"))
+    subdivision = to_text_or_none(lines[0]) if isinstance(lines, list) and lines else None
+    # Insert-or-refresh in one statement; NULLs never clobber known values and an
+    # all-NULL refresh leaves an existing row untouched
+    batch["accounts_upsert"].append(
+        {
+            "account_id": account_id,
+            "address": address,
+            "neighborhood": neighborhood,
+            "mapsco": mapsco,
+            "subdivision": subdivision,
+        },
+    )
+    # -------- primary_improvements (core mapping) --------
+    primary: Dict[str, Any] = (
+        detail.get("primary_improvements")
+        or detail.get("main_improvement")
+        or detail.get("primary")
+        or {}
+    )
+
+    params = {c: conv(primary.get(c)) for c, conv in _PRIMARY_CONV.items()}
+    params["stories"] = to_text_or_none(primary.get("stories_raw")) or params["stories"]
+    params["account_id"] = account_id
+    batch["primary_upsert"].append(params)
+
+    # -------- secondary_improvements (core mapping) --------
+    sec_list = detail.get("secondary_improvements") or []
+    batch["secondary_delete"].append({"account_id": account_id})
+    if sec_list:
+        rows = [
+            {
+                "account_id": account_id,
+                "tax_obj_id": to_text_or_none(row.get("tax_obj_id")),
+                "sec_imp_number": num,
+                "sec_imp_type": to_text_or_none(row.get("imp_type")),
+                "sec_imp_desc": to_text_or_none(row.get("imp_desc")),
+                "sec_imp_year_built": to_int_or_none(row.get("year_built")),
+                "sec_imp_cons_type": to_text_or_none(row.get("construction")),
+                "sec_imp_floor": to_text_or_none(row.get("floor_type")),
+                "sec_imp_ext_wall": to_text_or_none(row.get("ext_wall")),
+                "sec_imp_stories": to_numeric_str_or_none(row.get("num_stories")),
+                "sec_imp_sqft": to_int_or_none(row.get("area_size")),
+                "sec_imp_value": to_numeric_str_or_none(row.get("value")),
+                "sec_imp_depreciation": to_numeric_str_or_none(row.get("depreciation")),
+            }
+            for row in sec_list
+            if (num := to_int_or_none(row.get("imp_num"))) is not None
+        ]
+        batch["secondary_insert"].extend(rows)
+
+    # -------- owner_summary and owner_parties --------
+    owner = detail.get("owner") or {}
+    owner_name = to_text_or_none(owner.get("owner_name"))
+    mailing_address = to_text_or_none(owner.get("mailing_address"))
+    if tax_year:
+        batch["owner_summary_upsert"].append(
+            {
+                "account_id": account_id,
+                "tax_year": tax_year,
+                "owner_name": owner_name,
+                "mailing_address": mailing_address,
+            },
+        )
+        batch["owner_parties_delete"].append({"account_id": account_id, "tax_year": tax_year})
+        parties = [
+            {
+                "account_id": account_id,
+                "tax_year": tax_year,
+                "owner_name": to_text_or_none(p.get("owner_name")) or (owner_name or ""),
+                "ownership_pct": to_numeric_str_or_none(p.get("ownership_pct")),
+            }
+            for p in (owner.get("multi_owner") or [])
+        ]
+        batch["owner_parties_insert"].extend(parties)
+
+    # ARB hearing
+    arb = detail.get("arb_hearing") or {}
+    info = to_text_or_none(arb.get("hearing_info")) or ""
+    # crude parse: first MM/DD/YYYY date and first "Hearing Info: X" type, in one scan
+    hearing_date = None
+    hearing_type = None
+    for m in _ARB_INFO.finditer(info):
+        if m.group("y") and hearing_date is None:
+            hearing_date = f"{m.group('y')}-{int(m.group('mo')):02d}-{int(m.group('d')):02d}"
+        elif m.group("t") and hearing_type is None:
+            hearing_type = m.group("t")
+        if hearing_date and hearing_type:
+            break
+    if hearing_date or hearing_type or info:
+        batch["arb_hearing_insert"].append(
+            {"account_id": account_id, "hearing_date": hearing_date, "hearing_type": hearing_type, "result": None},
+        )
+
+    # -------- value_summary current + history --------
+    vs = detail.get("value_summary") or {}
+    cert_year = _year_or_none(vs.get("certified_year"))
+    if cert_year:
+        # Both tables take the same row; a data-modifying CTE writes them in
+        # one round-trip. History binds the raw params rather than RETURNING
+        # so it is not fed values coalesced from the current row.
+        batch["value_summary_upsert"].append(
+            {
+                "account_id": account_id,
+                "certified_year": cert_year,
+                "improvement_value": to_numeric_str_or_none(vs.get("improvement_value")),
+                "land_value": to_numeric_str_or_none(vs.get("land_value")),
+                "market_value": to_numeric_str_or_none(vs.get("market_value")),
+                "capped_value": to_numeric_str_or_none(vs.get("capped_value")),
+                "tax_agent": to_text_or_none(vs.get("tax_agent")),
+                "revaluation_year": to_int_or_none(vs.get("revaluation_year")),
+                "previous_revaluation_year": to_int_or_none(vs.get("previous_revaluation_year")),
+            },
         )
 
-        # Extract values
-        def _bool(v):
-            t = to_text_or_none(v)
-            if t is None:
-                return None
-            return t.strip().upper() in {"Y", "YES", "TRUE", "1"}
-
-        construction_type = to_text_or_none(primary.get("construction_type"))
-        percent_complete = to_decimal_or_none(primary.get("percent_complete"))
-        year_built = to_int_or_none(primary.get("year_built"))
-        effective_year_built = to_int_or_none(primary.get("effective_year_built"))
-        actual_age = to_int_or_none(primary.get("actual_age"))
-        depreciation = to_decimal_or_none(primary.get("depreciation"))
-        desirability = to_text_or_none(primary.get("desirability"))
-        stories_text = to_text_or_none(primary.get("stories_raw")) or to_text_or_none(primary.get("stories"))
-        living_area_sqft = to_int_or_none(primary.get("living_area_sqft"))
-        total_living_area = to_int_or_none(primary.get("total_living_area"))
-        bedroom_count = to_int_or_none(primary.get("bedroom_count"))
-        baths_full = to_int_or_none(primary.get("baths_full"))
-        baths_half = to_int_or_none(primary.get("baths_half"))
-        bath_count = to_decimal_or_none(primary.get("bath_count"))
-        basement = _bool(primary.get("basement"))
-        kitchens = to_int_or_none(primary.get("kitchens"))
-        wetbars = to_int_or_none(primary.get("wetbars"))
-        fireplaces = to_int_or_none(primary.get("fireplaces"))
-        sprinkler = _bool(primary.get("sprinkler"))
-        spa = _bool(primary.get("spa"))
-        pool = _bool(primary.get("pool"))
-        sauna = _bool(primary.get("sauna"))
-        air_conditioning = to_text_or_none(primary.get("air_conditioning"))
-        heating = to_text_or_none(primary.get("heating"))
-        foundation = to_text_or_none(primary.get("foundation"))
-        roof_material = to_text_or_none(primary.get("roof_material"))
-        roof_type = to_text_or_none(primary.get("roof_type"))
-        exterior_material = to_text_or_none(primary.get("exterior_material"))
-        fence_type = to_text_or_none(primary.get("fence_type"))
-        number_units = to_int_or_none(primary.get("number_units"))
-        building_class = to_text_or_none(primary.get("building_class"))
-        desirability_raw = to_text_or_none(primary.get("desirability_raw"))
-        desirability_id = to_int_or_none(primary.get("desirability_id"))
-        total_area_sqft = to_int_or_none(primary.get("total_area_sqft"))
-        stories_raw = to_text_or_none(primary.get("stories_raw"))
-        deck = to_text_or_none(primary.get("deck"))
-        basement_raw = to_text_or_none(primary.get("basement_raw"))
-
-        if (_SCHEMA or "").lower() == "core":
-            s.execute(
-                text(
-                    f"""
-                    INSERT INTO {_tbl('primary_improvements')} (
-                      account_id,
-                      construction_type, percent_complete, year_built, effective_year_built, actual_age,
-                      depreciation, desirability, stories, living_area_sqft, total_living_area,
-                      bedroom_count, bath_count, basement, kitchens, wetbars, fireplaces, sprinkler,
-                      spa, pool, sauna, air_conditioning, heating, foundation, roof_material, roof_type,
-                      exterior_material, fence_type, number_units, building_class, desirability_raw,
-                      desirability_id, total_area_sqft, stories_raw, baths_full, baths_half, deck, basement_raw
-                    ) VALUES (
-                      :account_id,
-                      :construction_type, :percent_complete, :year_built, :effective_year_built, :actual_age,
-                      :depreciation, :desirability, :stories, :living_area_sqft, :total_living_area,
-                      :bedroom_count, :bath_count, :basement, :kitchens, :wetbars, :fireplaces, :sprinkler,
-                      :spa, :pool, :sauna, :air_conditioning, :heating, :foundation, :roof_material, :roof_type,
-                      :exterior_material, :fence_type, :number_units, :building_class, :desirability_raw,
-                      :desirability_id, :total_area_sqft, :stories_raw, :baths_full, :baths_half, :deck, :basement_raw
-                    )
-                    ON CONFLICT (account_id) DO UPDATE SET
-                      construction_type = COALESCE(EXCLUDED.construction_type, {_tbl('primary_improvements')}.construction_type),
-                      percent_complete = COALESCE(EXCLUDED.percent_complete, {_tbl('primary_improvements')}.percent_complete),
-                      year_built = COALESCE(EXCLUDED.year_built, {_tbl('primary_improvements')}.year_built),
-                      effective_year_built = COALESCE(EXCLUDED.effective_year_built, {_tbl('primary_improvements')}.effective_year_built),
-                      actual_age = COALESCE(EXCLUDED.actual_age, {_tbl('primary_improvements')}.actual_age),
-                      depreciation = COALESCE(EXCLUDED.depreciation, {_tbl('primary_improvements')}.depreciation),
-                      desirability = COALESCE(EXCLUDED.desirability, {_tbl('primary_improvements')}.desirability),
-                      stories = COALESCE(EXCLUDED.stories, {_tbl('primary_improvements')}.stories),
-                      living_area_sqft = COALESCE(EXCLUDED.living_area_sqft, {_tbl('primary_improvements')}.living_area_sqft),
-                      total_living_area = COALESCE(EXCLUDED.total_living_area, {_tbl('primary_improvements')}.total_living_area),
-                      bedroom_count = COALESCE(EXCLUDED.bedroom_count, {_tbl('primary_improvements')}.bedroom_count),
-                      bath_count = COALESCE(EXCLUDED.bath_count, {_tbl('primary_improvements')}.bath_count),
-                      basement = COALESCE(EXCLUDED.basement, {_tbl('primary_improvements')}.basement),
-                      kitchens = COALESCE(EXCLUDED.kitchens, {_tbl('primary_improvements')}.kitchens),
-                      wetbars = COALESCE(EXCLUDED.wetbars, {_tbl('primary_improvements')}.wetbars),
-                      fireplaces = COALESCE(EXCLUDED.fireplaces, {_tbl('primary_improvements')}.fireplaces),
-                      sprinkler = COALESCE(EXCLUDED.sprinkler, {_tbl('primary_improvements')}.sprinkler),
-                      spa = COALESCE(EXCLUDED.spa, {_tbl('primary_improvements')}.spa),
-                      pool = COALESCE(EXCLUDED.pool, {_tbl('primary_improvements')}.pool),
-                      sauna = COALESCE(EXCLUDED.sauna, {_tbl('primary_improvements')}.sauna),
-                      air_conditioning = COALESCE(EXCLUDED.air_conditioning, {_tbl('primary_improvements')}.air_conditioning),
-                      heating = COALESCE(EXCLUDED.heating, {_tbl('primary_improvements')}.heating),
-                      foundation = COALESCE(EXCLUDED.foundation, {_tbl('primary_improvements')}.foundation),
-                      roof_material = COALESCE(EXCLUDED.roof_material, {_tbl('primary_improvements')}.roof_material),
-                      roof_type = COALESCE(EXCLUDED.roof_type, {_tbl('primary_improvements')}.roof_type),
-                      exterior_material = COALESCE(EXCLUDED.exterior_material, {_tbl('primary_improvements')}.exterior_material),
-                      fence_type = COALESCE(EXCLUDED.fence_type, {_tbl('primary_improvements')}.fence_type),
-                      number_units = COALESCE(EXCLUDED.number_units, {_tbl('primary_improvements')}.number_units),
-                      building_class = COALESCE(EXCLUDED.building_class, {_tbl('primary_improvements')}.building_class),
-                      desirability_raw = COALESCE(EXCLUDED.desirability_raw, {_tbl('primary_improvements')}.desirability_raw),
-                      desirability_id = COALESCE(EXCLUDED.desirability_id, {_tbl('primary_improvements')}.desirability_id),
-                      total_area_sqft = COALESCE(EXCLUDED.total_area_sqft, {_tbl('primary_improvements')}.total_area_sqft),
-                      stories_raw = COALESCE(EXCLUDED.stories_raw, {_tbl('primary_improvements')}.stories_raw),
-                      baths_full = COALESCE(EXCLUDED.baths_full, {_tbl('primary_improvements')}.baths_full),
-                      baths_half = COALESCE(EXCLUDED.baths_half, {_tbl('primary_improvements')}.baths_half),
-                      deck = COALESCE(EXCLUDED.deck, {_tbl('primary_improvements')}.deck),
-                      basement_raw = COALESCE(EXCLUDED.basement_raw, {_tbl('primary_improvements')}.basement_raw)
-                    """
-                ),
+    # -------- market_value_history --------
+    mv_list = history.get("market_value") or []
+    mv_rows = [
+        {
+            "account_id": account_id,
+            "tax_year": yr,
+            "imp_value": to_numeric_str_or_none(mv.get("improvement")),
+            "land_value": to_numeric_str_or_none(mv.get("land")),
+            "total_market_value": to_numeric_str_or_none(mv.get("total_market")),
+            "homestead_capped": to_numeric_str_or_none(mv.get("homestead_capped")),
+        }
+        for mv in mv_list
+        if (yr := to_int_or_none(mv.get("year")))
+    ]
+    batch["market_value_upsert"].extend(mv_rows)
+
+    # -------- taxable_value_history --------
+    tv_list = history.get("taxable_value") or []
+    # One row per (year, jurisdiction) with a value
+    tv_rows = [
+        {"account_id": account_id, "tax_year": yr, "jur": key, "taxable_value": val}
+        for tv in tv_list
+        if (yr := to_int_or_none(tv.get("year")))
+        for key in ("city","isd","county","college","hospital","special_district")
+        if (val := to_numeric_str_or_none(tv.get(key))) is not None
+    ]
+    batch["taxable_value_upsert"].extend(tv_rows)
+
+    # -------- exemptions summary + history (current year) --------
+    ex = detail.get("exemptions") or {}
+    if tax_year:
+        for key, row in ex.items():
+            row = row or {}
+            # Summary and history take the identical row; build it once for both
+            ex_params = {
+                "account_id": account_id,
+                "tax_year": tax_year,
+                "jurisdiction_key": key,
+                "taxing_jurisdiction": to_text_or_none(row.get("taxing_jurisdiction")),
+                "homestead_exemption": to_numeric_str_or_none(row.get("homestead_exemption")) or 0,
+                "disabled_vet": to_numeric_str_or_none(row.get("disabled_vet")) or 0,
+                "taxable_value": to_numeric_str_or_none(row.get("taxable_value")) or 0,
+            }
+            batch["exemptions_summary_upsert"].append(ex_params)
+            batch["exemptions_history_upsert"].append(ex_params)
+
+    # -------- land_detail (replace current year) --------
+    land_rows = detail.get("land_detail") or []
+    if tax_year and land_rows:
+        batch["land_delete"].append({"account_id": account_id, "tax_year": tax_year})
+        for r in land_rows:
+            batch["land_insert"].append(
                 {
                     "account_id": account_id,
-                    "construction_type": construction_type,
-                    "percent_complete": percent_complete,
-                    "year_built": year_built,
-                    "effective_year_built": effective_year_built,
-                    "actual_age": actual_age,
-                    "depreciation": depreciation,
-                    "desirability": desirability,
-                    "stories": stories_text,
-                    "living_area_sqft": living_area_sqft,
-                    "total_living_area": total_living_area,
-                    "bedroom_count": bedroom_count,
-                    "bath_count": bath_count,
-                    "basement": basement,
-                    "kitchens": kitchens,
-                    "wetbars": wetbars,
-                    "fireplaces": fireplaces,
-                    "sprinkler": sprinkler,
-                    "spa": spa,
-                    "pool": pool,
-                    "sauna": sauna,
-                    "air_conditioning": air_conditioning,
-                    "heating": heating,
-                    "foundation": foundation,
-                    "roof_material": roof_material,
-                    "roof_type": roof_type,
-                    "exterior_material": exterior_material,
-                    "fence_type": fence_type,
-                    "number_units": number_units,
-                    "building_class": building_class,
-                    "desirability_raw": desirability_raw,
-                    "desirability_id": desirability_id,
-                    "total_area_sqft": total_area_sqft,
-                    "stories_raw": stories_raw,
-                    "baths_full": baths_full,
-                    "baths_half": baths_half,
-                    "deck": deck,
-                    "basement_raw": basement_raw,
+                    "tax_year": tax_year,
+                    "line_number": to_int_or_none(r.get("number")) or 0,
+                    "state_code": to_text_or_none(r.get("state_code")),
+                    "zoning": to_text_or_none(r.get("zoning")),
+                    "frontage_ft": to_numeric_str_or_none(r.get("frontage_ft")),
+                    "depth_ft": to_numeric_str_or_none(r.get("depth_ft")),
+                    "area_sqft": to_numeric_str_or_none(r.get("area_sqft")),
+                    "pricing_method": to_text_or_none(r.get("pricing_method")),
+                    "unit_price": to_numeric_str_or_none(r.get("unit_price")),
+                    "market_adjustment_pct": to_numeric_str_or_none(r.get("market_adjustment_pct")),
+                    "adjusted_price": to_numeric_str_or_none(r.get("adjusted_price")),
+                    "ag_land": to_text_or_none(r.get("ag_land")),
                 },
             )
 
-        # -------- secondary_improvements (core mapping) --------
-        sec_list = (detail or {}).get("secondary_improvements") or []
-        if (_SCHEMA or "").lower() == "core":
-            s.execute(
-                text(f"DELETE FROM {_tbl('secondary_improvements')} WHERE account_id = :account_id"),
-                {"account_id": account_id},
+    # -------- legal_description current + history --------
+    ld = detail.get("legal_description") or {}
+    if tax_year:
+        legal_lines = ld.get("lines") or []
+        batch["legal_current_upsert"].append(
+            {
+                "account_id": account_id,
+                "tax_year": tax_year,
+                "legal_lines": legal_lines,
+                "legal_text": "; ".join(legal_lines),
+                "deed_transfer_raw": to_text_or_none(ld.get("deed_transfer_date")),
+                "deed_transfer_date": None,
+            },
+        )
+
+    # history from owner_history, one row per observed year. A repeated year
+    # folds the way back-to-back upserts would: the later entry wins, except
+    # that a missing deed date keeps the earlier one.
+    by_year: Dict[int, Tuple[Optional[str], Optional[str], List[str]]] = {}
+    for oh in history.get("owner_history") or []:
+        yr = to_int_or_none(oh.get("observed_year"))
+        if not yr:
+            continue
+        deed_date = to_text_or_none(oh.get("deed_transfer_date_iso"))
+        if deed_date is None and yr in by_year:
+            deed_date = by_year[yr][1]
+        by_year[yr] = (
+            to_text_or_none(oh.get("deed_transfer_date_raw")),
+            deed_date,
+            oh.get("legal_description_lines") or [],
+        )
+    batch["owner_history_upsert"].extend(
+        {
+            "account_id": account_id,
+            "observed_year": yr,
+            "deed_raw": deed_raw,
+            "deed_date": deed_date,
+            "legal_lines": orjson.dumps(lines).decode(),
+            "legal_text": "; ".join(lines),
+        }
+        for yr, (deed_raw, deed_date, lines) in by_year.items()
+    )
+
+    # -------- estimated_taxes and total (replace current year) --------
+    et = detail.get("estimated_taxes") or {}
+    if tax_year:
+        batch["estimated_taxes_delete"].append({"account_id": account_id, "tax_year": tax_year})
+        for key in ("city","school","county","college","hospital","special_district"):
+            row = et.get(key) or {}
+            batch["estimated_taxes_insert"].append(
+                {
+                    "account_id": account_id,
+                    "tax_year": tax_year,
+                    "jurisdiction_key": key,
+                    "taxing_unit": to_text_or_none(row.get("taxing_unit")),
+                    "tax_rate_per_100": to_numeric_str_or_none(row.get("tax_rate_per_100")),
+                    # "0", not 0: every element of a bound array must share a type
+                    "taxable_value": to_numeric_str_or_none(row.get("taxable_value")) or "0",
+                    "estimated_taxes_amt": to_numeric_str_or_none(row.get("estimated_taxes")) or "0",
+                    "tax_ceiling": to_numeric_str_or_none(row.get("tax_ceiling")),
+                },
             )
-            if sec_list:
-                ins = text(
-                    f"""
-                    INSERT INTO {_tbl('secondary_improvements')} (
-                      account_id, tax_obj_id, sec_imp_number, sec_imp_type, sec_imp_desc,
-                      sec_imp_year_built, sec_imp_cons_type, sec_imp_floor, sec_imp_ext_wall,
-                      sec_imp_stories, sec_imp_sqft, sec_imp_value, sec_imp_depreciation
-                    ) VALUES (
-                      :account_id, :tax_obj_id, :sec_imp_number, :sec_imp_type, :sec_imp_desc,
-                      :sec_imp_year_built, :sec_imp_cons_type, :sec_imp_floor, :sec_imp_ext_wall,
-                      :sec_imp_stories, :sec_imp_sqft, :sec_imp_value, :sec_imp_depreciation
-                    )
-                    """
-                )
-                for row in sec_list:
-                    num = to_int_or_none(row.get("imp_num"))
-                    if num is None:
-                        continue
-                    s.execute(
-                        ins,
-                        {
-                            "account_id": account_id,
-                            "tax_obj_id": to_text_or_none(row.get("tax_obj_id")),
-                            "sec_imp_number": num,
-                            "sec_imp_type": to_text_or_none(row.get("imp_type")),
-                            "sec_imp_desc": to_text_or_none(row.get("imp_desc")),
-                            "sec_imp_year_built": to_int_or_none(row.get("year_built")),
-                            "sec_imp_cons_type": to_text_or_none(row.get("construction")),
-                            "sec_imp_floor": to_text_or_none(row.get("floor_type")),
-                            "sec_imp_ext_wall": to_text_or_none(row.get("ext_wall")),
-                            "sec_imp_stories": to_decimal_or_none(row.get("num_stories")),
-                            "sec_imp_sqft": to_int_or_none(row.get("area_size")),
-                            "sec_imp_value": to_decimal_or_none(row.get("value")),
-                            "sec_imp_depreciation": to_decimal_or_none(row.get("depreciation")),
-                        },
-                    )
-
-        # -------- owner_summary and owner_parties --------
-        if (_SCHEMA or "").lower() == "core":
-            # determine tax_year from detail
-            try:
-                tax_year = int((detail or {}).get("tax_year")) if (detail or {}).get("tax_year") else None
-            except Exception:
-                tax_year = None
-
-            owner = (detail or {}).get("owner") or {}
-            owner_name = to_text_or_none(owner.get("owner_name"))
-            mailing_address = to_text_or_none(owner.get("mailing_address"))
-            if tax_year:
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('owner_summary')} (account_id, tax_year, owner_name, mailing_address)
-                        VALUES (:account_id, :tax_year, :owner_name, :mailing_address)
-                        ON CONFLICT (account_id, tax_year) DO UPDATE SET
-                          owner_name = COALESCE(EXCLUDED.owner_name, {_tbl('owner_summary')}.owner_name),
-                          mailing_address = COALESCE(EXCLUDED.mailing_address, {_tbl('owner_summary')}.mailing_address)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "tax_year": tax_year,
-                        "owner_name": owner_name,
-                        "mailing_address": mailing_address,
-                    },
-                )
-                s.execute(
-                    text(f"DELETE FROM {_tbl('owner_parties')} WHERE account_id = :account_id AND tax_year = :tax_year"),
-                    {"account_id": account_id, "tax_year": tax_year},
-                )
-                for p in (owner.get("multi_owner") or []):
-                    s.execute(
-                        text(
-                            f"""
-                            INSERT INTO {_tbl('owner_parties')} (account_id, tax_year, owner_name, ownership_pct)
-                            VALUES (:account_id, :tax_year, :owner_name, :ownership_pct)
-                            """
-                        ),
-                        {
-                            "account_id": account_id,
-                            "tax_year": tax_year,
-                            "owner_name": to_text_or_none(p.get("owner_name")) or (owner_name or ""),
-                            "ownership_pct": to_decimal_or_none(p.get("ownership_pct")),
-                        },
-                    )
-
-            # ARB hearing
-            arb = (detail or {}).get("arb_hearing") or {}
-            info = to_text_or_none(arb.get("hearing_info")) or ""
-            # crude parse: look for a date like MM/DD/YYYY
-            import re
-            m = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", info)
-            hearing_date = None
-            if m:
-                mm, dd, yy = m.groups()
-                hearing_date = f"{yy}-{int(mm):02d}-{int(dd):02d}"
-            m2 = re.search(r"Hearing Info:\s*([A-Z])\b", info)
-            hearing_type = m2.group(1) if m2 else None
-            if hearing_date or hearing_type or info:
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('arb_hearing')} (account_id, hearing_date, hearing_type, result)
-                        VALUES (:account_id, :hearing_date, :hearing_type, :result)
-                        ON CONFLICT DO NOTHING
-                        """
-                    ),
-                    {"account_id": account_id, "hearing_date": hearing_date, "hearing_type": hearing_type, "result": None},
-                )
-
-        # -------- value_summary current + history --------
-        if (_SCHEMA or "").lower() == "core":
-            vs = (detail or {}).get("value_summary") or {}
-            def _money(v):
-                return to_decimal_or_none(v)
-            cert_year = None
-            try:
-                cert_year = int(vs.get("certified_year")) if vs.get("certified_year") else None
-            except Exception:
-                cert_year = None
-            if cert_year:
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('value_summary_current')} (
-                          account_id, certified_year, improvement_value, land_value, market_value, capped_value,
-                          tax_agent, revaluation_year, previous_revaluation_year
-                        ) VALUES (
-                          :account_id, :certified_year, :improvement_value, :land_value, :market_value, :capped_value,
-                          :tax_agent, :revaluation_year, :previous_revaluation_year
-                        )
-                        ON CONFLICT (account_id) DO UPDATE SET
-                          certified_year = COALESCE(EXCLUDED.certified_year, {_tbl('value_summary_current')}.certified_year),
-                          improvement_value = COALESCE(EXCLUDED.improvement_value, {_tbl('value_summary_current')}.improvement_value),
-                          land_value = COALESCE(EXCLUDED.land_value, {_tbl('value_summary_current')}.land_value),
-                          market_value = COALESCE(EXCLUDED.market_value, {_tbl('value_summary_current')}.market_value),
-                          capped_value = COALESCE(EXCLUDED.capped_value, {_tbl('value_summary_current')}.capped_value),
-                          tax_agent = COALESCE(EXCLUDED.tax_agent, {_tbl('value_summary_current')}.tax_agent),
-                          revaluation_year = COALESCE(EXCLUDED.revaluation_year, {_tbl('value_summary_current')}.revaluation_year),
-                          previous_revaluation_year = COALESCE(EXCLUDED.previous_revaluation_year, {_tbl('value_summary_current')}.previous_revaluation_year)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "certified_year": cert_year,
-                        "improvement_value": _money(vs.get("improvement_value")),
-                        "land_value": _money(vs.get("land_value")),
-                        "market_value": _money(vs.get("market_value")),
-                        "capped_value": _money(vs.get("capped_value")),
-                        "tax_agent": to_text_or_none(vs.get("tax_agent")),
-                        "revaluation_year": to_int_or_none(vs.get("revaluation_year")),
-                        "previous_revaluation_year": to_int_or_none(vs.get("previous_revaluation_year")),
-                    },
-                )
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('value_summary_history')} (
-                          account_id, certified_year, improvement_value, land_value, market_value, capped_value,
-                          tax_agent, revaluation_year, previous_revaluation_year
-                        ) VALUES (
-                          :account_id, :certified_year, :improvement_value, :land_value, :market_value, :capped_value,
-                          :tax_agent, :revaluation_year, :previous_revaluation_year
-                        )
-                        ON CONFLICT (account_id, certified_year) DO UPDATE SET
-                          improvement_value = COALESCE(EXCLUDED.improvement_value, {_tbl('value_summary_history')}.improvement_value),
-                          land_value = COALESCE(EXCLUDED.land_value, {_tbl('value_summary_history')}.land_value),
-                          market_value = COALESCE(EXCLUDED.market_value, {_tbl('value_summary_history')}.market_value),
-                          capped_value = COALESCE(EXCLUDED.capped_value, {_tbl('value_summary_history')}.capped_value),
-                          tax_agent = COALESCE(EXCLUDED.tax_agent, {_tbl('value_summary_history')}.tax_agent),
-                          revaluation_year = COALESCE(EXCLUDED.revaluation_year, {_tbl('value_summary_history')}.revaluation_year),
-                          previous_revaluation_year = COALESCE(EXCLUDED.previous_revaluation_year, {_tbl('value_summary_history')}.previous_revaluation_year)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "certified_year": cert_year,
-                        "improvement_value": _money(vs.get("improvement_value")),
-                        "land_value": _money(vs.get("land_value")),
-                        "market_value": _money(vs.get("market_value")),
-                        "capped_value": _money(vs.get("capped_value")),
-                        "tax_agent": to_text_or_none(vs.get("tax_agent")),
-                        "revaluation_year": to_int_or_none(vs.get("revaluation_year")),
-                        "previous_revaluation_year": to_int_or_none(vs.get("previous_revaluation_year")),
-                    },
-                )
-
-        # -------- market_value_history --------
-        if (_SCHEMA or "").lower() == "core":
-            mv_list = (history or {}).get("market_value") or []
-            for mv in mv_list:
-                yr = to_int_or_none(mv.get("year"))
-                if not yr:
-                    continue
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('market_value_history')} (
-                          account_id, tax_year, imp_value, land_value, total_market_value, homestead_capped
-                        ) VALUES (
-                          :account_id, :tax_year, :imp_value, :land_value, :total_market_value, :homestead_capped
-                        )
-                        ON CONFLICT (account_id, tax_year) DO UPDATE SET
-                          imp_value = COALESCE(EXCLUDED.imp_value, {_tbl('market_value_history')}.imp_value),
-                          land_value = COALESCE(EXCLUDED.land_value, {_tbl('market_value_history')}.land_value),
-                          total_market_value = COALESCE(EXCLUDED.total_market_value, {_tbl('market_value_history')}.total_market_value),
-                          homestead_capped = COALESCE(EXCLUDED.homestead_capped, {_tbl('market_value_history')}.homestead_capped)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "tax_year": yr,
-                        "imp_value": to_decimal_or_none(mv.get("improvement")),
-                        "land_value": to_decimal_or_none(mv.get("land")),
-                        "total_market_value": to_decimal_or_none(mv.get("total_market")),
-                        "homestead_capped": to_decimal_or_none(mv.get("homestead_capped")),
-                    },
-                )
-
-        # -------- taxable_value_history --------
-        if (_SCHEMA or "").lower() == "core":
-            tv_list = (history or {}).get("taxable_value") or []
-            for tv in tv_list:
-                yr = to_int_or_none(tv.get("year"))
-                if not yr:
-                    continue
-                for key in ("city","isd","county","college","hospital","special_district"):
-                    val = to_decimal_or_none(tv.get(key))
-                    if val is None:
-                        continue
-                    s.execute(
-                        text(
-                            f"""
-                            INSERT INTO {_tbl('taxable_value_history')} (account_id, tax_year, jurisdiction_key, taxable_value)
-                            VALUES (:account_id, :tax_year, :jur, :taxable_value)
-                            ON CONFLICT (account_id, tax_year, jurisdiction_key) DO UPDATE SET
-                              taxable_value = EXCLUDED.taxable_value
-                            """
-                        ),
-                        {"account_id": account_id, "tax_year": yr, "jur": key, "taxable_value": val},
-                    )
-
-        # -------- exemptions summary + history (current year) --------
-        if (_SCHEMA or "").lower() == "core":
-            try:
-                tax_year = int((detail or {}).get("tax_year")) if (detail or {}).get("tax_year") else None
-            except Exception:
-                tax_year = None
-            ex = (detail or {}).get("exemptions") or {}
-            if tax_year:
-                for key, row in ex.items():
-                    s.execute(
-                        text(
-                            f"""
-                            INSERT INTO {_tbl('exemptions_summary')} (
-                              account_id, tax_year, jurisdiction_key, taxing_jurisdiction, homestead_exemption, disabled_vet, taxable_value
-                            ) VALUES (
-                              :account_id, :tax_year, :jur, :tj, :he, :dv, :tv
-                            )
-                            ON CONFLICT (account_id, jurisdiction_key) DO UPDATE SET
-                              taxing_jurisdiction = COALESCE(EXCLUDED.taxing_jurisdiction, {_tbl('exemptions_summary')}.taxing_jurisdiction),
-                              homestead_exemption = COALESCE(EXCLUDED.homestead_exemption, {_tbl('exemptions_summary')}.homestead_exemption),
-                              disabled_vet = COALESCE(EXCLUDED.disabled_vet, {_tbl('exemptions_summary')}.disabled_vet),
-                              taxable_value = COALESCE(EXCLUDED.taxable_value, {_tbl('exemptions_summary')}.taxable_value)
-                            """
-                        ),
-                        {
-                            "account_id": account_id,
-                            "tax_year": tax_year,
-                            "jur": key,
-                            "tj": to_text_or_none((row or {}).get("taxing_jurisdiction")),
-                            "he": to_decimal_or_none((row or {}).get("homestead_exemption")) or 0,
-                            "dv": to_decimal_or_none((row or {}).get("disabled_vet")) or 0,
-                            "tv": to_decimal_or_none((row or {}).get("taxable_value")) or 0,
-                        },
-                    )
-                    s.execute(
-                        text(
-                            f"""
-                            INSERT INTO {_tbl('exemptions_history')} (
-                              account_id, tax_year, jurisdiction_key, taxing_jurisdiction, homestead_exemption, disabled_vet, taxable_value
-                            ) VALUES (
-                              :account_id, :tax_year, :jur, :tj, :he, :dv, :tv
-                            )
-                            ON CONFLICT (account_id, tax_year, jurisdiction_key) DO UPDATE SET
-                              taxing_jurisdiction = COALESCE(EXCLUDED.taxing_jurisdiction, {_tbl('exemptions_history')}.taxing_jurisdiction),
-                              homestead_exemption = COALESCE(EXCLUDED.homestead_exemption, {_tbl('exemptions_history')}.homestead_exemption),
-                              disabled_vet = COALESCE(EXCLUDED.disabled_vet, {_tbl('exemptions_history')}.disabled_vet),
-                              taxable_value = COALESCE(EXCLUDED.taxable_value, {_tbl('exemptions_history')}.taxable_value)
-                            """
-                        ),
-                        {
-                            "account_id": account_id,
-                            "tax_year": tax_year,
-                            "jur": key,
-                            "tj": to_text_or_none((row or {}).get("taxing_jurisdiction")),
-                            "he": to_decimal_or_none((row or {}).get("homestead_exemption")) or 0,
-                            "dv": to_decimal_or_none((row or {}).get("disabled_vet")) or 0,
-                            "tv": to_decimal_or_none((row or {}).get("taxable_value")) or 0,
-                        },
-                    )
-
-        # -------- land_detail (replace current year) --------
-        if (_SCHEMA or "").lower() == "core":
-            try:
-                tax_year = int((detail or {}).get("tax_year")) if (detail or {}).get("tax_year") else None
-            except Exception:
-                tax_year = None
-            land_rows = (detail or {}).get("land_detail") or []
-            if tax_year and land_rows:
-                s.execute(
-                    text(f"DELETE FROM {_tbl('land_detail')} WHERE account_id = :account_id AND tax_year = :tax_year"),
-                    {"account_id": account_id, "tax_year": tax_year},
-                )
-                ins = text(
-                    f"""
-                    INSERT INTO {_tbl('land_detail')} (
-                      account_id, tax_year, line_number, state_code, zoning, frontage_ft, depth_ft,
-                      area_sqft, pricing_method, unit_price, market_adjustment_pct, adjusted_price, ag_land
-                    ) VALUES (
-                      :account_id, :tax_year, :line_number, :state_code, :zoning, :frontage_ft, :depth_ft,
-                      :area_sqft, :pricing_method, :unit_price, :market_adjustment_pct, :adjusted_price, :ag_land
-                    )
-                    """
-                )
-                for r in land_rows:
-                    s.execute(
-                        ins,
-                        {
-                            "account_id": account_id,
-                            "tax_year": tax_year,
-                            "line_number": to_int_or_none(r.get("number")) or 0,
-                            "state_code": to_text_or_none(r.get("state_code")),
-                            "zoning": to_text_or_none(r.get("zoning")),
-                            "frontage_ft": to_decimal_or_none(r.get("frontage_ft")),
-                            "depth_ft": to_decimal_or_none(r.get("depth_ft")),
-                            "area_sqft": to_decimal_or_none(r.get("area_sqft")),
-                            "pricing_method": to_text_or_none(r.get("pricing_method")),
-                            "unit_price": to_decimal_or_none(r.get("unit_price")),
-                            "market_adjustment_pct": to_decimal_or_none(r.get("market_adjustment_pct")),
-                            "adjusted_price": to_decimal_or_none(r.get("adjusted_price")),
-                            "ag_land": to_text_or_none(r.get("ag_land")),
-                        },
-                    )
-
-        # -------- legal_description current + history --------
-        if (_SCHEMA or "").lower() == "core":
-            try:
-                tax_year = int((detail or {}).get("tax_year")) if (detail or {}).get("tax_year") else None
-            except Exception:
-                tax_year = None
-            ld = (detail or {}).get("legal_description") or {}
-            if tax_year:
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('legal_description_current')} (
-                          account_id, tax_year, legal_lines, legal_text, deed_transfer_raw, deed_transfer_date
-                        ) VALUES (
-                          :account_id, :tax_year, CAST(:legal_lines_json AS JSONB), :legal_text, :deed_raw, :deed_date
-                        )
-                        ON CONFLICT (account_id) DO UPDATE SET
-                          tax_year = EXCLUDED.tax_year,
-                          legal_lines = EXCLUDED.legal_lines,
-                          legal_text = EXCLUDED.legal_text,
-                          deed_transfer_raw = EXCLUDED.deed_transfer_raw,
-                          deed_transfer_date = COALESCE(EXCLUDED.deed_transfer_date, {_tbl('legal_description_current')}.deed_transfer_date)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "tax_year": tax_year,
-                        "legal_lines_json": json.dumps(ld.get("lines") or []),
-                        "legal_text": "; ".join(ld.get("lines") or []),
-                        "deed_raw": to_text_or_none(ld.get("deed_transfer_date")),
-                        "deed_date": None,
-                    },
-                )
-
-            # history from owner_history
-            for oh in (history or {}).get("owner_history") or []:
-                yr = to_int_or_none(oh.get("observed_year"))
-                if not yr:
-                    continue
-                # Ownership history row
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('ownership_history')} (
-                          account_id, observed_year, deed_transfer_date_raw, deed_transfer_date
-                        ) VALUES (
-                          :account_id, :observed_year, :deed_raw, :deed_date
-                        )
-                        ON CONFLICT (account_id, observed_year) DO UPDATE SET
-                          deed_transfer_date_raw = EXCLUDED.deed_transfer_date_raw,
-                          deed_transfer_date = COALESCE(EXCLUDED.deed_transfer_date, {_tbl('ownership_history')}.deed_transfer_date)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "observed_year": yr,
-                        "deed_raw": to_text_or_none(oh.get("deed_transfer_date_raw")),
-                        "deed_date": to_text_or_none(oh.get("deed_transfer_date_iso")),
-                    },
-                )
-                lines = oh.get("legal_description_lines") or []
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('legal_description_history')} (
-                          account_id, tax_year, legal_lines, legal_text, deed_transfer_raw, deed_transfer_date
-                        ) VALUES (
-                          :account_id, :tax_year, CAST(:legal_lines_json AS JSONB), :legal_text, :deed_raw, :deed_date
-                        )
-                        ON CONFLICT (account_id, tax_year) DO UPDATE SET
-                          legal_lines = EXCLUDED.legal_lines,
-                          legal_text = EXCLUDED.legal_text,
-                          deed_transfer_raw = EXCLUDED.deed_transfer_raw,
-                          deed_transfer_date = COALESCE(EXCLUDED.deed_transfer_date, {_tbl('legal_description_history')}.deed_transfer_date)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "tax_year": yr,
-                        "legal_lines_json": json.dumps(lines),
-                        "legal_text": "; ".join(lines),
-                        "deed_raw": to_text_or_none(oh.get("deed_transfer_date_raw")),
-                        "deed_date": to_text_or_none(oh.get("deed_transfer_date_iso")),
-                    },
-                )
-
-        # -------- estimated_taxes and total (replace current year) --------
-        if (_SCHEMA or "").lower() == "core":
-            try:
-                tax_year = int((detail or {}).get("tax_year")) if (detail or {}).get("tax_year") else None
-            except Exception:
-                tax_year = None
-            et = (detail or {}).get("estimated_taxes") or {}
-            if tax_year:
-                s.execute(
-                    text(f"DELETE FROM {_tbl('estimated_taxes')} WHERE account_id = :account_id AND tax_year = :tax_year"),
-                    {"account_id": account_id, "tax_year": tax_year},
-                )
-                ins = text(
-                    f"""
-                    INSERT INTO {_tbl('estimated_taxes')} (
-                      account_id, tax_year, jurisdiction_key, taxing_unit, tax_rate_per_100,
-                      taxable_value, estimated_taxes_amt, tax_ceiling
-                    ) VALUES (
-                      :account_id, :tax_year, :jur, :unit, :rate, :taxable_value, :est_amt, :ceiling
-                    )
-                    """
-                )
-                for key in ("city","school","county","college","hospital","special_district"):
-                    row = et.get(key) or {}
-                    s.execute(
-                        ins,
-                        {
-                            "account_id": account_id,
-                            "tax_year": tax_year,
-                            "jur": key,
-                            "unit": to_text_or_none(row.get("taxing_unit")),
-                            "rate": to_decimal_or_none(row.get("tax_rate_per_100")),
-                            "taxable_value": to_decimal_or_none(row.get("taxable_value")) or 0,
-                            "est_amt": to_decimal_or_none(row.get("estimated_taxes")) or 0,
-                            "ceiling": to_decimal_or_none(row.get("tax_ceiling")),
-                        },
-                    )
-                # total line
-                s.execute(
-                    text(
-                        f"""
-                        INSERT INTO {_tbl('estimated_taxes_total')} (account_id, tax_year, total_estimated)
-                        VALUES (:account_id, :tax_year, :total)
-                        ON CONFLICT (account_id) DO UPDATE SET
-                          tax_year = COALESCE(EXCLUDED.tax_year, {_tbl('estimated_taxes_total')}.tax_year),
-                          total_estimated = COALESCE(EXCLUDED.total_estimated, {_tbl('estimated_taxes_total')}.total_estimated)
-                        """
-                    ),
-                    {
-                        "account_id": account_id,
-                        "tax_year": tax_year,
-                        "total": to_decimal_or_none((detail or {}).get("estimated_taxes_total")) or 0,
-                    },
-                )
-
-        s.commit()
+        # total line
+        batch["estimated_taxes_total_upsert"].append(
+            {
+                "account_id": account_id,
+                "tax_year": tax_year,
+                "total": to_numeric_str_or_none(detail.get("estimated_taxes_total")) or 0,
+            },
+        )
+    return True
+
+
+def _execute_batch(conn: Connection, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Run one executemany per statement, in _STMTS order.
+
+    That order puts accounts before their child rows and every replace-style
+    DELETE before the INSERTs that repopulate it.
+    """
+    for name, stmt in _STMTS.items():
+        params = batch.get(name)
+        if not params:
+            continue
+        # Large batches go over COPY where the driver allows; otherwise the
+        # executemany is routed through psycopg2's batch helpers.
+        if len(params) > _COPY_MIN_ROWS and name in _COPY_WRITERS:
+            cur = _copy_cursor(conn)
+            if cur is not None:
+                with cur:
+                    _COPY_WRITERS[name](cur, params)
+                continue
+        if name in _UNNEST_COLUMNS:
+            conn.execute(stmt, {k: [p[k] for p in params] for k in _UNNEST_COLUMNS[name]})
+            continue
+        conn.execute(stmt, params)
+
+
+_ASYNC_COMMIT_SQL = text("SET LOCAL synchronous_commit = off")
+
+
+@contextmanager
+def _pipelined(conn: Connection):
+    """Run the enclosed statements in libpq pipeline mode when the driver offers it.
+
+    psycopg 3 (``postgresql+psycopg://``) exposes ``Connection.pipeline()``, which
+    sends statements without waiting on each result. psycopg2 has no pipeline
+    support, so on the default driver this is a no-op.
+    """
+    raw = conn.connection.driver_connection
+    pipeline = getattr(raw, "pipeline", None)
+    if pipeline is None:
+        yield
+        return
+    with pipeline():
+        yield
+
+
+def upsert_parsed_many(
+    items: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+    *,
+    async_commit: bool = False,
+) -> None:
+    """Upsert several parsed accounts in one explicit transaction.
+
+    Parameter sets are gathered across all accounts first, then each target
+    statement runs once as an executemany.
+
+    ``async_commit`` sets ``synchronous_commit = off`` for this transaction only,
+    trading durability of the last few commits on a server crash for not
+    waiting on the WAL flush. Meant for re-runnable bulk backfills.
+    """
+    if not _IS_CORE:
+        # Every normalized table lives in the core schema; nothing to write elsewhere.
+        return
+    # Last payload wins for an account listed twice; otherwise both copies'
+    # replace-style child rows would land after the shared DELETE.
+    latest = {account_id: (detail, history) for account_id, detail, history in items}
+    batch: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    written = [
+        account_id
+        for account_id, (detail, history) in latest.items()
+        if _collect_account(batch, account_id, detail, history)
+    ]
+    if not written:
+        return
+    # A plain Core connection: every statement here is Core, so the ORM
+    # Session's per-execute bookkeeping buys nothing. One BEGIN ... COMMIT.
+    with get_engine().begin() as conn:
+        if async_commit:
+            conn.execute(_ASYNC_COMMIT_SQL)
+        # Reads first: a pipeline only delivers result rows after a sync
+        _merge_existing_primary(conn, batch)
+        with _pipelined(conn):
+            _execute_batch(conn, batch)
+    for account_id in written:
         log.info("Upsert core estimated taxes complete for account_id=%s", account_id)
+
+
+def upsert_parsed(account_id: str, detail: Dict[str, Any], history: Dict[str, Any]) -> None:
+    upsert_parsed_many([(account_id, detail, history)])
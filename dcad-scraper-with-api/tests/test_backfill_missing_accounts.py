@@ -0,0 +1,67 @@
+import csv
+import importlib.util
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "tools" / "backfill_missing_accounts.py"
+SPEC = importlib.util.spec_from_file_location("backfill_missing_accounts", MODULE_PATH)
+MODULE = importlib.util.module_from_spec(SPEC)
+assert SPEC and SPEC.loader
+SPEC.loader.exec_module(MODULE)
+
+
+DETAIL = {
+    "account_id": "00000776533000000",
+    "owner": {"owner_name": "SMITH, JOHN \"JR\"", "mailing_address": "PO BOX 1\tDALLAS"},
+    "property_location": {"address": "123 MAIN ST"},
+    "value_summary": {"market_value": "$250,000", "land_value": 50000.5},
+}
+
+
+class _CopyCursor:
+    def __init__(self):
+        self.copied = None
+
+    def execute(self, sql):
+        pass
+
+    def copy_expert(self, sql, buf):
+        self.copied = buf.read()
+
+
+class RowFromDetailTests(unittest.TestCase):
+    def test_flattens_nested_owner(self):
+        row = MODULE.row_from_detail(DETAIL)
+        self.assertEqual(row["owner_name"], "SMITH, JOHN \"JR\"")
+
+    def test_rejects_non_scalar_field(self):
+        with self.assertRaisesRegex(ValueError, "account_id"):
+            MODULE.row_from_detail({"account_id": ["00000776533000000"]})
+
+    def test_integral_floats_become_ints(self):
+        row = MODULE.row_from_detail(dict(DETAIL, year_built=1999.0, living_area_sqft=1500.5))
+        self.assertEqual((row["year_built"], type(row["year_built"])), (1999, int))
+        self.assertEqual(row["living_area_sqft"], 1500.5)
+        self.assertEqual(row["market_value"], 250000)
+
+    def test_copy_and_execute_values_see_same_values(self):
+        row = MODULE.row_from_detail(dict(DETAIL, year_built=1999.0, bedroom_count=3))
+
+        cur = _CopyCursor()
+        MODULE.copy_rows(cur, [row])
+        copied = next(csv.reader(cur.copied.splitlines(), delimiter="\t"))
+
+        with mock.patch.object(MODULE, "execute_values") as ev:
+            conn = mock.MagicMock()
+            MODULE.upsert_rows(conn, [row])
+        (values,) = ev.call_args.args[2]
+
+        self.assertEqual(len(copied), len(values))
+        for col, text, value in zip(MODULE.COLS, copied, values):
+            self.assertEqual(text, "\\N" if value is None else str(value), col)
+
+
+if __name__ == "__main__":
+    unittest.main()
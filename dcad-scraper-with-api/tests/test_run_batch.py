@@ -0,0 +1,44 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+SCRAPER_PATH = Path(__file__).resolve().parents[1] / "scraper"
+sys.path.insert(0, str(SCRAPER_PATH))
+
+from dcad import run_batch  # noqa: E402
+
+
+class FlushTests(unittest.TestCase):
+    def test_grouped_success_writes_once(self) -> None:
+        pending = [("A", {"x": 1}, {}), ("B", {"x": 2}, {})]
+        with mock.patch.object(run_batch, "upsert_parsed_many") as many, \
+                mock.patch.object(run_batch, "upsert_parsed") as single:
+            run_batch._flush(pending, async_commit=True)
+        many.assert_called_once()
+        self.assertEqual(many.call_args.kwargs, {"async_commit": True})
+        single.assert_not_called()
+        self.assertEqual(pending, [])
+
+    def test_grouped_failure_retries_each_account(self) -> None:
+        pending = [("A", {"x": 1}, {}), ("BAD", {"x": 2}, {}), ("C", {"x": 3}, {})]
+        written = []
+
+        def one(acc, detail, history):
+            if acc == "BAD":
+                raise ValueError("bad payload")
+            written.append(acc)
+
+        with mock.patch.object(run_batch, "upsert_parsed_many", side_effect=ValueError("bad payload")), \
+                mock.patch.object(run_batch, "upsert_parsed", side_effect=one), \
+                self.assertLogs("dcad.run_batch", level="ERROR") as logs:
+            run_batch._flush(pending)
+        self.assertEqual(written, ["A", "C"])
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("BAD", logs.output[0])
+        self.assertEqual(pending, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+
+SCRAPER_PATH = Path(__file__).resolve().parents[1] / "scraper"
+sys.path.insert(0, str(SCRAPER_PATH))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from dcad.run_once import _fallback_mailing_address, _snapshot_tax_year  # noqa: E402
+
+
+OWNER_BLOCK = (
+    '<div><span id="lblOwner" class="DtlSectionHdr">Owner (Current 2026)</span>'
+    "PATTERSON GREGORY SCOTT &amp;<br />GINA R<br />1909 SNOWMASS LN<br />"
+    "GARLAND, TEXAS&nbsp;750446751<br />"
+    '<span id="lblMultiOwner" class="DtlSectionHdr">Multi-Owner</span>'
+    "<table><tr><td>Owner Name</td><td>Ownership %</td></tr></table></div>"
+)
+
+
+class SnapshotTaxYearTests(unittest.TestCase):
+    def test_prefers_parsed_tax_year(self):
+        self.assertEqual(_snapshot_tax_year({"tax_year": 2024, "year": "2023"}), 2024)
+
+    def test_falls_through_to_alternate_keys(self):
+        self.assertEqual(_snapshot_tax_year({"tax_year": None, "assessment_year": "2022"}), 2022)
+
+    def test_skips_non_numeric_values(self):
+        self.assertEqual(_snapshot_tax_year({"tax_year": "N/A", "year": "2021"}), 2021)
+
+    def test_defaults_to_current_year(self):
+        self.assertEqual(_snapshot_tax_year({}), datetime.now().year)
+
+
+class FallbackMailingAddressTests(unittest.TestCase):
+    def test_recovers_address_after_co_owner_line(self):
+        detail = {"owner": {"owner_name": "PATTERSON GREGORY SCOTT &", "mailing_address": None}}
+        _fallback_mailing_address(BeautifulSoup(OWNER_BLOCK, "html.parser"), detail)
+        self.assertEqual(
+            detail["owner"]["mailing_address"],
+            "1909 SNOWMASS LN, GARLAND, TEXAS 750446751",
+        )
+
+    def test_trims_stray_commas_between_lines(self):
+        html = OWNER_BLOCK.replace("1909 SNOWMASS LN<br />", "PO BOX 12 ,<br />")
+        detail = {"owner": {}}
+        _fallback_mailing_address(BeautifulSoup(html, "html.parser"), detail)
+        self.assertEqual(
+            detail["owner"]["mailing_address"],
+            "PO BOX 12, GARLAND, TEXAS 750446751",
+        )
+
+    def test_keeps_parsed_address(self):
+        detail = {"owner": {"mailing_address": "PO BOX 1, DALLAS, TX 75201"}}
+        _fallback_mailing_address(BeautifulSoup(OWNER_BLOCK, "html.parser"), detail)
+        self.assertEqual(detail["owner"]["mailing_address"], "PO BOX 1, DALLAS, TX 75201")
+
+    def test_creates_owner_when_missing(self):
+        detail = {}
+        _fallback_mailing_address(BeautifulSoup(OWNER_BLOCK, "html.parser"), detail)
+        self.assertEqual(
+            detail["owner"]["mailing_address"],
+            "1909 SNOWMASS LN, GARLAND, TEXAS 750446751",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import contextlib
+import sys
+import unittest
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+
+SCRAPER_PATH = Path(__file__).resolve().parents[1] / "scraper"
+sys.path.insert(0, str(SCRAPER_PATH))
+
+from dcad import upsert  # noqa: E402
+from dcad.upsert import (  # noqa: E402
+    _collect_account,
+    _copy_field,
+    _year_or_none,
+    to_decimal_or_none,
+    to_int_or_none,
+    to_numeric_str_or_none,
+)
+
+
+class CopyFieldTests(unittest.TestCase):
+    def test_none_is_copy_null_marker(self) -> None:
+        self.assertEqual(_copy_field(None), "\\N")
+
+    def test_values_are_stringified(self) -> None:
+        self.assertEqual(_copy_field(Decimal("12.50")), "12.50")
+        self.assertEqual(_copy_field(1999), "1999")
+
+    def test_escapes_text_format_specials(self) -> None:
+        self.assertEqual(_copy_field("a\tb\nc\rd\\e"), "a\\tb\\nc\\rd\\\\e")
+
+
+class NumericCoercionTests(unittest.TestCase):
+    def test_int_strips_currency_and_commas(self) -> None:
+        self.assertEqual(to_int_or_none("$1,234"), 1234)
+        self.assertEqual(to_int_or_none("(1,234)"), -1234)
+
+    def test_int_truncates_fractional_values(self) -> None:
+        self.assertEqual(to_int_or_none("3.7"), 3)
+        self.assertEqual(to_int_or_none("-3.7"), -3)
+
+    def test_int_rejects_percent_and_garbage(self) -> None:
+        self.assertIsNone(to_int_or_none("50%"))
+        self.assertIsNone(to_int_or_none("abc"))
+        self.assertIsNone(to_int_or_none("N/A"))
+
+    def test_decimal_strips_currency_percent_and_parens(self) -> None:
+        self.assertEqual(to_decimal_or_none("$1,234.50"), Decimal("1234.50"))
+        self.assertEqual(to_decimal_or_none("12.5%"), Decimal("12.5"))
+        self.assertEqual(to_decimal_or_none("(7.25)"), Decimal("-7.25"))
+        self.assertIsNone(to_decimal_or_none("$"))
+
+    def test_numeric_str_passes_cleaned_literal_through(self) -> None:
+        self.assertEqual(to_numeric_str_or_none("$1,234.50"), "1234.50")
+        self.assertEqual(to_numeric_str_or_none("(7.25)"), "-7.25")
+        self.assertEqual(to_numeric_str_or_none(Decimal("0.5")), "0.5")
+        self.assertEqual(to_numeric_str_or_none("1e3"), "1e3")
+
+    def test_numeric_str_rejects_what_postgres_would_reject(self) -> None:
+        self.assertIsNone(to_numeric_str_or_none("abc"))
+        self.assertIsNone(to_numeric_str_or_none("1.2.3"))
+        self.assertIsNone(to_numeric_str_or_none("$"))
+        self.assertIsNone(to_numeric_str_or_none("N/A"))
+
+    def test_numeric_str_rejects_non_ascii_digits(self) -> None:
+        self.assertIsNone(to_numeric_str_or_none("\u0661\u0662\u0663"))
+        self.assertIsNone(to_numeric_str_or_none("\uff11,\uff12\uff13\uff14"))
+
+
+class YearParsingTests(unittest.TestCase):
+    def test_parses_ints_and_digit_strings(self) -> None:
+        self.assertEqual(_year_or_none("2024"), 2024)
+        self.assertEqual(_year_or_none(2025), 2025)
+
+    def test_empty_or_unparseable_is_none(self) -> None:
+        for v in (None, "", 0, "N/A", "2024.5", {"y": 1}):
+            self.assertIsNone(_year_or_none(v))
+
+
+def _collect(detail, history=None, account_id="A1"):
+    batch = defaultdict(list)
+    wrote = _collect_account(batch, account_id, detail, history or {})
+    return wrote, batch
+
+
+class CollectAccountTests(unittest.TestCase):
+    def test_empty_payload_writes_nothing(self) -> None:
+        for account_id, detail, history in (("A1", {}, {}), ("A1", None, None), ("", {"tax_year": 2024}, {})):
+            wrote, batch = _collect(detail, history, account_id)
+            self.assertFalse(wrote)
+            self.assertEqual(dict(batch), {})
+
+    def test_arb_info_takes_first_date_and_type(self) -> None:
+        info = "Hearing Info: P scheduled 7/4/2024, moved to 08/15/2024; Hearing Info: X"
+        wrote, batch = _collect({"arb_hearing": {"hearing_info": info}})
+        self.assertTrue(wrote)
+        self.assertEqual(
+            batch["arb_hearing_insert"],
+            [{"account_id": "A1", "hearing_date": "2024-07-04", "hearing_type": "P", "result": None}],
+        )
+
+    def test_arb_info_without_matches_keeps_row(self) -> None:
+        _, batch = _collect({"arb_hearing": {"hearing_info": "Pending"}})
+        self.assertEqual(
+            batch["arb_hearing_insert"],
+            [{"account_id": "A1", "hearing_date": None, "hearing_type": None, "result": None}],
+        )
+
+    def test_owner_history_folds_repeated_year(self) -> None:
+        history = {
+            "owner_history": [
+                {"observed_year": "2023", "deed_transfer_date_raw": "1/2/2020",
+                 "deed_transfer_date_iso": "2020-01-02", "legal_description_lines": ["OLD"]},
+                {"observed_year": 2024, "legal_description_lines": []},
+                {"observed_year": "2023", "deed_transfer_date_raw": "later",
+                 "legal_description_lines": ["LOT 1", "BLK 2"]},
+                {"observed_year": None, "deed_transfer_date_iso": "1999-01-01"},
+            ]
+        }
+        _, batch = _collect({}, history)
+        self.assertEqual(
+            batch["owner_history_upsert"],
+            [
+                {"account_id": "A1", "observed_year": 2023, "deed_raw": "later", "deed_date": "2020-01-02",
+                 "legal_lines": '["LOT 1","BLK 2"]', "legal_text": "LOT 1; BLK 2"},
+                {"account_id": "A1", "observed_year": 2024, "deed_raw": None, "deed_date": None,
+                 "legal_lines": "[]", "legal_text": ""},
+            ],
+        )
+
+
+class UpsertParsedManyTests(unittest.TestCase):
+    def _run(self, items):
+        seen = []
+        with mock.patch.multiple(
+            upsert,
+            _IS_CORE=True,
+            get_engine=mock.DEFAULT,
+            _merge_existing_primary=mock.DEFAULT,
+            _pipelined=lambda conn: contextlib.nullcontext(),
+            _execute_batch=lambda conn, batch: seen.append(batch),
+        ) as mocks:
+            upsert.upsert_parsed_many(items)
+        return seen, mocks["get_engine"]
+
+    def test_last_payload_wins_for_repeated_account(self) -> None:
+        seen, _ = self._run(
+            [
+                ("A1", {"arb_hearing": {"hearing_info": "1/1/2023"}}, {}),
+                ("B2", {"arb_hearing": {"hearing_info": "2/2/2023"}}, {}),
+                ("A1", {"arb_hearing": {"hearing_info": "3/3/2024"}}, {}),
+            ]
+        )
+        (batch,) = seen
+        self.assertEqual(
+            [(p["account_id"], p["hearing_date"]) for p in batch["arb_hearing_insert"]],
+            [("A1", "2024-03-03"), ("B2", "2023-02-02")],
+        )
+
+    def test_nothing_to_write_skips_the_transaction(self) -> None:
+        seen, get_engine = self._run([("A1", {}, {}), ("B2", None, None)])
+        self.assertEqual(seen, [])
+        get_engine.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,66 +1,117 @@
 #!/usr/bin/env python
-import argparse, csv, json, time, asyncio, os
-from urllib.parse import urlencode
+import argparse, csv, io, asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 import httpx
+import orjson
 import psycopg2
 from psycopg2.extras import execute_values
 
 def connect_db(dsn: str):
     return psycopg2.connect(dsn)
 
-def existing_accounts(conn):
-    with conn.cursor() as cur:
+def existing_accounts(conn, account_ids):
+    """Subset of account_ids already in properties.
+
+    Only the seeded candidates are looked up, so the client never holds the
+    full table's id set.
+    """
+    # Named (server-side) cursor: rows stream in itersize batches instead of
+    # the whole result being buffered client-side first
+    with conn.cursor(name="acct_stream") as cur:
         cur.itersize = 50000
-        cur.execute("SELECT account_id FROM properties")
-        return {row[0] for row in cur.fetchall()}
+        cur.execute("SELECT account_id FROM properties WHERE account_id = ANY(%s)", (list(account_ids),))
+        return {row[0] for row in cur}
+
+COLS = [
+    "account_id","situs_address","city","owner_name","total_value","property_type","year_built",
+    "stories","bedroom_count","bath_count","living_area_sqft","pool","basement",
+    "market_value","land_value","improvement_value","source","raw"
+]
+
+UPSERT_SET = """
+    ON CONFLICT (account_id) DO UPDATE SET
+      situs_address=EXCLUDED.situs_address,
+      city=EXCLUDED.city,
+      owner_name=EXCLUDED.owner_name,
+      total_value=EXCLUDED.total_value,
+      property_type=EXCLUDED.property_type,
+      year_built=EXCLUDED.year_built,
+      stories=EXCLUDED.stories,
+      bedroom_count=EXCLUDED.bedroom_count,
+      bath_count=EXCLUDED.bath_count,
+      living_area_sqft=EXCLUDED.living_area_sqft,
+      pool=EXCLUDED.pool,
+      basement=EXCLUDED.basement,
+      market_value=EXCLUDED.market_value,
+      land_value=EXCLUDED.land_value,
+      improvement_value=EXCLUDED.improvement_value,
+      last_seen=now(),
+      source=EXCLUDED.source,
+      raw=EXCLUDED.raw
+"""
+
+# row_from_detail fills every column, so rows can be unpacked in C
+ROW_VALUES = itemgetter(*COLS)
+
+INSERT_SQL = f"INSERT INTO properties ({','.join(COLS)}) VALUES %s" + UPSERT_SET
+MERGE_SQL = f"INSERT INTO properties ({','.join(COLS)}) SELECT {','.join(COLS)} FROM stg_properties" + UPSERT_SET
+COPY_SQL = f"COPY stg_properties ({','.join(COLS)}) FROM STDIN WITH (FORMAT csv, DELIMITER E'\\t', NULL '\\N')"
+
+# Above this many rows, COPY into a staging table and merge once; below it
+# the temp table setup costs more than execute_values saves.
+COPY_MIN_ROWS = 500
+
+def copy_rows(cur, rows):
+    """Stage rows with COPY, then merge them into properties in one statement."""
+    cur.execute("CREATE TEMP TABLE stg_properties (LIKE properties INCLUDING DEFAULTS) ON COMMIT DROP")
+    buf = io.StringIO()
+    w = csv.writer(buf, delimiter="\t", quoting=csv.QUOTE_MINIMAL)
+    w.writerows(["\\N" if v is None else v for v in ROW_VALUES(r)] for r in rows)
+    buf.seek(0)
+    cur.copy_expert(COPY_SQL, buf)
+    cur.execute(MERGE_SQL)
 
 def upsert_rows(conn, rows):
-    cols = [
-        "account_id","situs_address","city","owner_name","total_value","property_type","year_built",
-        "stories","bedroom_count","bath_count","living_area_sqft","pool","basement",
-        "market_value","land_value","improvement_value","source","raw"
-    ]
     if not rows: return
     with conn.cursor() as cur:
-        execute_values(cur, f"""
-            INSERT INTO properties ({",".join(cols)})
-            VALUES %s
-            ON CONFLICT (account_id) DO UPDATE SET
-              situs_address=EXCLUDED.situs_address,
-              city=EXCLUDED.city,
-              owner_name=EXCLUDED.owner_name,
-              total_value=EXCLUDED.total_value,
-              property_type=EXCLUDED.property_type,
-              year_built=EXCLUDED.year_built,
-              stories=EXCLUDED.stories,
-              bedroom_count=EXCLUDED.bedroom_count,
-              bath_count=EXCLUDED.bath_count,
-              living_area_sqft=EXCLUDED.living_area_sqft,
-              pool=EXCLUDED.pool,
-              basement=EXCLUDED.basement,
-              market_value=EXCLUDED.market_value,
-              land_value=EXCLUDED.land_value,
-              improvement_value=EXCLUDED.improvement_value,
-              last_seen=now(),
-              source=EXCLUDED.source,
-              raw=EXCLUDED.raw
-        """, [tuple(r.get(c) for c in cols) for r in rows])
+        if len(rows) > COPY_MIN_ROWS:
+            copy_rows(cur, rows)
+        else:
+            execute_values(cur, INSERT_SQL, [ROW_VALUES(r) for r in rows], page_size=COPY_MIN_ROWS)
     conn.commit()
 
 def to_number(x):
     if x in (None, ""): return None
+    # JSON numbers need no string cleanup (bools fall through and fail as before)
+    if isinstance(x, (int, float)) and not isinstance(x, bool):
+        return float(x)
     try:
         return float(str(x).replace(",", "").replace("$", ""))
     except:
         return None
 
+# Types stored identically by the COPY path (str(v)) and by execute_values
+# (psycopg2 adaptation); anything else would diverge between the two
+SCALAR_TYPES = (str, int, float, bool)
+
 def row_from_detail(d: dict, source="scraper"):
+    """properties row for a detail payload; every value is None or a scalar.
+
+    Raises ValueError for a non-scalar field so both write paths reject it alike.
+    Integral floats become ints: COPY would send 1234.0 as text, which integer
+    columns reject while execute_values accepts it.
+    """
     vs = d.get("value_summary", {}) or d.get("vs", {}) or {}
-    return {
+    owner = d.get("owner") or d.get("owner_name")
+    if isinstance(owner, dict):
+        # /detail responses nest the name under owner.owner_name
+        owner = owner.get("owner_name")
+    row = {
         "account_id": d.get("account_id") or d.get("account") or d.get("acct") or d.get("id"),
         "situs_address": d.get("address") or d.get("situs_address"),
         "city": d.get("city"),
-        "owner_name": d.get("owner") or d.get("owner_name"),
+        "owner_name": owner,
         "total_value": to_number(vs.get("total_value") or d.get("total_value")),
         "property_type": d.get("type") or d.get("property_type"),
         "year_built": d.get("year_built") or d.get("yr_blt"),
@@ -74,19 +125,25 @@ def row_from_detail(d: dict, source="scraper"):
         "land_value": to_number(vs.get("land_value")),
         "improvement_value": to_number(vs.get("improvement_value")),
         "source": source,
-        "raw": json.dumps(d),
+        "raw": orjson.dumps(d).decode(),
     }
+    for col, v in row.items():
+        if isinstance(v, float) and v.is_integer():
+            row[col] = int(v)
+        elif v is not None and not isinstance(v, SCALAR_TYPES):
+            raise ValueError(f"{col}: expected a scalar, got {type(v).__name__}")
+    return row
 
 async def search_accounts_paged(api_base: str, street: str, page_size=50, client: httpx.AsyncClient | None = None):
-    """Walk pages using offset until empty page."""
+    """Walk pages using offset until a short page or the reported total."""
     all_ids = []
     offset = 0
+    url = f"{api_base}/search/address"
     while True:
         params = {"q": street, "include_detail": "0", "max_results": str(page_size), "offset": str(offset)}
-        url = f"{api_base}/search/address?{urlencode(params)}"
-        r = await client.get(url, timeout=60)
+        r = await client.get(url, params=params, timeout=60)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         page = data.get("results", [])
         if not page:
             break
@@ -97,16 +154,18 @@ async def search_accounts_paged(api_base: str, street: str, page_size=50, client
                 all_ids.append(acc)
         total = data.get("total")
         offset += len(page)
-        if total is not None and offset >= int(total):
+        # The API re-runs the whole upstream search for every page it serves
+        # (there is no cursor to seek on), so never ask for one past the end
+        if len(page) < page_size or (total is not None and offset >= int(total)):
             break
-        time.sleep(0.1)
+        await asyncio.sleep(0.1)
     return list(dict.fromkeys(all_ids))
 
 async def fetch_detail(api_base: str, account_id: str, client: httpx.AsyncClient):
     url = f"{api_base}/detail/{account_id}"
     r = await client.get(url, timeout=60)
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
     return data.get("detail", data)
 
 async def main():
@@ -124,35 +183,46 @@ async def main():
         streets = [ln.strip() for ln in fh if ln.strip() and not ln.strip().startswith("#")]
 
     conn = connect_db(args.db)
-    had = existing_accounts(conn)
-    print(f"Existing accounts in DB: {len(had):,}")
 
     done = set()
     if os.path.exists(args.checkpoint):
-        with open(args.checkpoint, "r", encoding="utf-8") as ck:
+        with open(args.checkpoint, "rb") as ck:
             for ln in ck:
                 try:
-                    obj = json.loads(ln)
+                    obj = orjson.loads(ln)
                     if obj.get("account_id"):
                         done.add(obj["account_id"])
                 except:
                     pass
         print(f"Resuming; already processed: {len(done):,}")
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
+    # Pool sized to the fetch concurrency so detail requests reuse keep-alive
+    # connections instead of opening new ones
+    pool_size = max(1, args.concurrency) * 2
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    async with httpx.AsyncClient(follow_redirects=True, limits=limits) as client:
         candidates = set()
-        for st in streets:
-            try:
-                accs = await search_accounts_paged(args.api, st, page_size=args.max_results, client=client)
-                print(f"{st}: {len(accs)} accounts (paged)")
-                candidates.update(accs)
-                time.sleep(0.2)
-            except Exception as e:
-                print(f"search failed for {st}: {e}")
+        search_sem = asyncio.Semaphore(max(1, args.concurrency))
+
+        async def search_one(st):
+            async with search_sem:
+                try:
+                    accs = await search_accounts_paged(args.api, st, page_size=args.max_results, client=client)
+                    print(f"{st}: {len(accs)} accounts (paged)")
+                    candidates.update(accs)
+                    await asyncio.sleep(0.2)
+                except Exception as e:
+                    print(f"search failed for {st}: {e}")
+
+        # Streets page independently; walk several at once
+        await asyncio.gather(*[search_one(st) for st in streets])
 
         print(f"Unique accounts from street seeds: {len(candidates):,}")
 
-        missing = [a for a in candidates if (a not in had and a not in done)]
+        had = existing_accounts(conn, candidates - done)
+        print(f"Candidates already in DB: {len(had):,}")
+
+        missing = list(candidates - done - had)
         print(f"Missing accounts to fetch: {len(missing):,}")
 
         out_cols = [
@@ -161,45 +231,105 @@ async def main():
             "market_value","land_value","improvement_value"
         ]
         os.makedirs(os.path.dirname(args.csv), exist_ok=True)
-        csvfh = open(args.csv, "a", newline="", encoding="utf-8")
-        writer = csv.DictWriter(csvfh, fieldnames=out_cols)
-        if csvfh.tell() == 0:
-            writer.writeheader()
+        # One line-buffered checkpoint handle for the run instead of an
+        # open/close per account; each record still reaches the file as soon
+        # as it is written. Fetched rows are only recorded once their upsert
+        # has committed, so a resume never skips an account that is missing
+        # from properties. Both handles close even if the run fails.
+        with open(args.csv, "a", newline="", encoding="utf-8", buffering=1 << 20) as csvfh, \
+                open(args.checkpoint, "a", buffering=1, encoding="utf-8") as ckfh:
+            writer = csv.DictWriter(csvfh, fieldnames=out_cols)
+            if csvfh.tell() == 0:
+                writer.writeheader()
 
-        sem = asyncio.Semaphore(max(1, args.concurrency))
-        batch, wrote = [], 0
+            def checkpoint(acc, error=None):
+                rec = {"account_id": acc} if error is None else {"account_id": acc, "error": error}
+                ckfh.write(orjson.dumps(rec).decode() + "\n")
 
-        async def work(acc):
-            async with sem:
+            sem = asyncio.Semaphore(max(1, args.concurrency))
+            batch, wrote = [], 0
+
+            async def work(acc):
+                async with sem:
+                    try:
+                        d = await fetch_detail(args.api, acc, client)
+                        row = row_from_detail(d, source="scraper")
+                        if row["account_id"]:
+                            batch.append((acc, row))  # CSV + checkpoint after commit
+                        else:
+                            checkpoint(acc)
+                        return True
+                    except Exception as e:
+                        print(f"detail failed for {acc}: {e}")
+                        checkpoint(acc, str(e))
+                        return False
+
+            def flush_rows(items):
+                """upsert_rows on the DB thread; returns (items, ok)."""
+                nonlocal conn
                 try:
-                    d = await fetch_detail(args.api, acc, client)
-                    row = row_from_detail(d, source="scraper")
-                    if row["account_id"]:
-                        writer.writerow({k: row.get(k) for k in out_cols})
-                        batch.append(row)
-                    with open(args.checkpoint, "a", encoding="utf-8") as ck:
-                        ck.write(json.dumps({"account_id": acc}) + "\n")
-                    return True
+                    upsert_rows(conn, [row for _, row in items])
+                    return items, True
                 except Exception as e:
-                    print(f"detail failed for {acc}: {e}")
-                    with open(args.checkpoint, "a", encoding="utf-8") as ck:
-                        ck.write(json.dumps({"account_id": acc, "error": str(e)}) + "\n")
-                    return False
-
-        CHUNK = 200
-        for i in range(0, len(missing), CHUNK):
-            chunk = missing[i:i+CHUNK]
-            _ = await asyncio.gather(*[work(a) for a in chunk])
-            try:
-                upsert_rows(conn, batch)
-                wrote += len(batch)
-                batch.clear()
-                print(f"Upserted total: {wrote:,} / {len(missing):,}")
-            except Exception as e:
-                print("upsert error:", e)
-            time.sleep(0.5)
-
-        csvfh.close()
+                    print("upsert error:", e)
+                # A dropped connection cannot roll back; reconnect so the retry
+                # of these rows has a live one instead of ending the run.
+                try:
+                    conn.rollback()
+                except psycopg2.Error as e:
+                    print("rollback failed, reconnecting:", e)
+                    try:
+                        conn.close()
+                        conn = connect_db(args.db)
+                    except psycopg2.Error as e:
+                        print("reconnect failed:", e)
+                return items, False
+
+            async def settle(fut):
+                nonlocal wrote
+                items, ok = await fut
+                if ok:
+                    # CSV rows go out with the checkpoint, once per committed
+                    # flush, so a resume never appends an account twice
+                    writer.writerows({k: row.get(k) for k in out_cols} for _, row in items)
+                    csvfh.flush()
+                    for acc, _ in items:
+                        checkpoint(acc)
+                    wrote += len(items)
+                    print(f"Upserted total: {wrote:,} / {len(missing):,}")
+                else:
+                    batch.extend(items)  # retried with the next flush
+
+            CHUNK = 200
+            # Rows are written once this many have accumulated (and after the last
+            # chunk), so large backfills reach the COPY path in upsert_rows.
+            FLUSH_ROWS = 2000
+            # Upserts run on one DB thread (it owns conn) while the next chunk is
+            # fetched; at most one is in flight, which is all the back-pressure needed.
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=1) as db_pool:
+                pending = None
+                for i in range(0, len(missing), CHUNK):
+                    chunk = missing[i:i+CHUNK]
+                    _ = await asyncio.gather(*[work(a) for a in chunk])
+                    if len(batch) < FLUSH_ROWS and i + CHUNK < len(missing):
+                        continue
+                    if pending is not None:
+                        await settle(pending)
+                    pending = loop.run_in_executor(db_pool, flush_rows, batch[:])
+                    batch.clear()
+                    await asyncio.sleep(0.5)
+                if pending is not None:
+                    await settle(pending)
+                if batch:
+                    # The last flush failed and settle() put its rows back; nothing
+                    # follows to retry them, so give them one more attempt here.
+                    retry = batch[:]
+                    batch.clear()
+                    await settle(loop.run_in_executor(db_pool, flush_rows, retry))
+                if batch:
+                    # Never checkpointed, so a rerun fetches them again
+                    print(f"Not upserted: {len(batch):,} fetched accounts; rerun to retry them")
     conn.close()
     print("DONE")
 